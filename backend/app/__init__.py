@@ -4,7 +4,6 @@ from flask import Flask, request, make_response
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from config import config
-from flask import send_from_directory
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -12,10 +11,36 @@ migrate = Migrate()
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+
+    from app.utils.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
+
+    # Registered first so its after_request hook runs last and sees final sizes.
+    from app.utils.metrics import metrics
+    metrics.init_app(app)
+
+    from app.utils.db_routing import replica_router
+    replica_router.init_app(app)
+
+    from app.utils.sqlite_profile import sqlite_profile
+    sqlite_profile.init_app(app)
+
+    from app.utils.cache import catalog_cache, catalog_version
+    catalog_version.init_app(app)
+    catalog_cache.init_app(app)
+
+    from app.utils.snapshot import catalog_snapshot
+    catalog_snapshot.init_app(app)
+
+    from app.utils.upload_queue import upload_queue
+    upload_queue.init_app(app)
+
+    from app.utils.contact_writer import contact_writer
+    contact_writer.init_app(app)
     
     # Manual CORS header injection (stable on Render/Vercel).
     allowed_origins = app.config.get("CORS_ORIGINS", ["*"])
@@ -31,7 +56,7 @@ def create_app(config_name='default'):
                 response.headers["Access-Control-Allow-Origin"] = origin
             response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
             response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-            response.headers["Vary"] = "Origin"
+            response.vary.add("Origin")
             return response
 
     @app.after_request
@@ -43,9 +68,13 @@ def create_app(config_name='default'):
             response.headers["Access-Control-Allow-Origin"] = origin
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
         response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        response.headers["Vary"] = "Origin"
+        # Merge rather than overwrite: some responses already vary on other headers.
+        response.vary.add("Origin")
         return response
 
+    from app.utils.compression import init_compression
+    init_compression(app)
+
     # Register blueprints
     from app.routes.products import products_bp
     from app.routes.contact import contact_bp
@@ -60,11 +89,15 @@ def create_app(config_name='default'):
     def health_check():
         return {'status': 'healthy', 'service': 'uptown-stitch-api'}
 
-    # Serve uploaded files (development only)
+    # Serve uploaded files (see app/utils/static_files.py for caching/offload)
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        return send_from_directory(app.config.get('UPLOAD_FOLDER'), filename)
-    
+        from app.utils.static_files import serve_upload
+        return serve_upload(filename)
+
+    # Last, so it can wrap every hook and view registered above.
+    from app.utils.tracing import tracer
+    tracer.init_app(app)
 
     # Optionally auto-seed database on startup when AUTO_SEED=1
     try:
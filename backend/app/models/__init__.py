@@ -1,4 +1,5 @@
 from .product import Product
 from .contact import ContactMessage
+from .upload_job import UploadJob
 
-__all__ = ['Product', 'ContactMessage']
+__all__ = ['Product', 'ContactMessage', 'UploadJob']
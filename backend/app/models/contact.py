@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from app.utils.serializers import contact_message_encoder
 
 class ContactMessage(db.Model):
     __tablename__ = 'contact_messages'
@@ -12,18 +13,16 @@ class ContactMessage(db.Model):
     message = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='new')  # new, read, replied
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    receipt_id = db.Column(db.String(32), nullable=True, unique=True)  # returned to the submitter
+
+    # The inbox is listed newest first, optionally filtered by status.
+    __table_args__ = (
+        db.Index('ix_contact_messages_status_created_at', 'status', created_at.desc(), id.desc()),
+        db.Index('ix_contact_messages_created_at', created_at.desc(), id.desc()),
+    )
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'subject': self.subject,
-            'message': self.message,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return contact_message_encoder.encode(self)
     
     def __repr__(self):
         return f'<ContactMessage {self.subject}>'
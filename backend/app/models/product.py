@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from app.utils.serializers import product_encoder
 
 class Product(db.Model):
     __tablename__ = 'products'
@@ -10,24 +11,33 @@ class Product(db.Model):
     price = db.Column(db.Float, nullable=False)
     category = db.Column(db.String(100), nullable=False)
     image_url = db.Column(db.String(500), nullable=True)
+    image_variants = db.Column(db.JSON, nullable=True)  # see app/utils/images.py
     in_stock = db.Column(db.Boolean, default=True)
     featured = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Indexes follow the query shapes in app/routes/products.py; see
+    # explain_queries.py for the plans they produce.
+    __table_args__ = (
+        db.Index('ix_products_category_featured_id', 'category', 'featured', 'id'),
+        db.Index('ix_products_category_id', 'category', 'id'),
+        db.Index('ix_products_featured_id', 'featured', 'id'),
+        # ?sort=price|-price|newest, walked backwards for descending sorts.
+        # Category and featured filters each lead their own copy; in_stock and
+        # price ranges are checked while walking, so no sort step is needed.
+        db.Index('ix_products_price_id', 'price', 'id'),
+        db.Index('ix_products_category_price_id', 'category', 'price', 'id'),
+        db.Index('ix_products_featured_price_id', 'featured', 'price', 'id'),
+        db.Index('ix_products_created_at_id', 'created_at', 'id'),
+        db.Index('ix_products_category_created_at_id', 'category', 'created_at', 'id'),
+        db.Index('ix_products_featured_created_at_id', 'featured', 'created_at', 'id'),
+        # Natural key for bulk imports, see app/utils/catalog_io.py
+        db.Index('ix_products_name', 'name'),
+    )
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'price': self.price,
-            'category': self.category,
-            'image_url': self.image_url,
-            'in_stock': self.in_stock,
-            'featured': self.featured,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return product_encoder.encode(self)
     
     def __repr__(self):
         return f'<Product {self.name}>'
@@ -0,0 +1,22 @@
+from datetime import datetime
+from app import db
+from app.utils.serializers import upload_job_encoder
+
+class UploadJob(db.Model):
+    __tablename__ = 'upload_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=True, index=True)
+    source_url = db.Column(db.String(500), nullable=False)  # local /uploads/... copy
+    remote_url = db.Column(db.String(500), nullable=True)
+    status = db.Column(db.String(20), default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return upload_job_encoder.encode(self)
+    
+    def __repr__(self):
+        return f'<UploadJob {self.id} {self.status}>'
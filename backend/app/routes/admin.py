@@ -1,9 +1,21 @@
-from flask import Blueprint, request, jsonify
+import math
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy import delete, select, update
 from app.models.product import Product
 from app.models.contact import ContactMessage
+from app.models.upload_job import UploadJob
 from app.utils.auth import token_required
 from app import db
 from app.utils.storage import upload_file
+from app.utils.images import cloudinary_variants, schedule_variants
+from app.utils.upload_queue import upload_queue
+from app.utils.serializers import contact_message_encoder
+from app.utils.catalog_io import export_csv, export_ndjson, import_rows, parse_rows
+from app.utils.cache import bump_catalog_version
+from app.utils.listing import Listing, read_only_session
+from app.utils.db_routing import replica_router
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -76,6 +88,7 @@ def seed_products():
             db.session.add(product)
 
         db.session.commit()
+        bump_catalog_version()
         return len(products_data)
 
     except Exception:
@@ -97,6 +110,8 @@ def create_product():
         for field in required_fields:
             if field not in data or not str(data[field]).strip():
                 return jsonify({'error': f'{field} is required'}), 400
+        if not math.isfinite(float(data['price'])):
+            return jsonify({'error': 'price must be a finite number'}), 400
 
         image_url = ''
         image_file = request.files.get('image')
@@ -111,14 +126,23 @@ def create_product():
             price=float(data['price']),
             category=data['category'].strip(),
             image_url=image_url,
+            image_variants=cloudinary_variants(image_url),
             in_stock=data.get('in_stock', True),
             featured=data.get('featured', False)
         )
 
         db.session.add(product)
         db.session.commit()
+        bump_catalog_version()
+
+        payload = product.to_dict()
+        job = upload_queue.enqueue(product) if image_file else None
+        if job is not None:
+            payload['upload_job'] = job.to_dict()
+        else:
+            schedule_variants(product)
 
-        return jsonify(product.to_dict()), 201
+        return jsonify(payload), 201
 
     except Exception as e:
         db.session.rollback()
@@ -131,9 +155,12 @@ def update_product(product_id):
     """Update an existing product"""
     try:
         product = Product.query.get_or_404(product_id)
+        previous_image_url = product.image_url
         data = request.get_json(silent=True)
         if not data:
             data = request.form.to_dict()
+        if 'price' in data and not math.isfinite(float(data['price'])):
+            return jsonify({'error': 'price must be a finite number'}), 400
 
         image_file = request.files.get('image')
         if image_file:
@@ -154,8 +181,21 @@ def update_product(product_id):
         if 'featured' in data:
             product.featured = bool(data['featured'])
 
+        image_changed = bool(image_file) or product.image_url != previous_image_url
+        if image_changed:
+            product.image_variants = cloudinary_variants(product.image_url)
+
         db.session.commit()
-        return jsonify(product.to_dict())
+        bump_catalog_version()
+
+        payload = product.to_dict()
+        job = upload_queue.enqueue(product) if image_file else None
+        if job is not None:
+            payload['upload_job'] = job.to_dict()
+        elif image_changed or not product.image_variants:
+            # Also catches variants skipped earlier because the pool was full.
+            schedule_variants(product)
+        return jsonify(payload)
 
     except Exception as e:
         db.session.rollback()
@@ -170,6 +210,7 @@ def delete_product(product_id):
         product = Product.query.get_or_404(product_id)
         db.session.delete(product)
         db.session.commit()
+        bump_catalog_version()
 
         return jsonify({'message': 'Product deleted successfully'})
 
@@ -178,34 +219,142 @@ def delete_product(product_id):
         return jsonify({'error': str(e)}), 500
 
 
+# Bulk catalog import/export
+@admin_bp.route('/admin/products/export', methods=['GET'])
+@token_required
+def export_products():
+    """Stream the whole catalog as NDJSON (default) or CSV"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+    batch_size = current_app.config.get('CATALOG_EXPORT_BATCH_SIZE', 500)
+    if fmt == 'csv':
+        rows, mimetype = export_csv(batch_size), 'text/csv'
+    else:
+        rows, mimetype = export_ndjson(batch_size), 'application/x-ndjson'
+    return Response(
+        stream_with_context(rows),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=products.{fmt}'}
+    )
+
+
+@admin_bp.route('/admin/products/import', methods=['POST'])
+@token_required
+def import_products():
+    """Upsert products from an NDJSON or CSV request body, keyed by name"""
+    try:
+        fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+        if fmt not in ('ndjson', 'csv'):
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+        results, summary, _ = import_rows(
+            parse_rows(request.stream, fmt),
+            batch_size=current_app.config.get('CATALOG_IMPORT_BATCH_SIZE', 500)
+        )
+
+        return jsonify({'summary': summary, 'results': results})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+# Remote upload jobs
+@admin_bp.route('/admin/upload-jobs', methods=['GET'])
+@token_required
+def get_upload_jobs():
+    """List recent remote upload jobs"""
+    try:
+        status = request.args.get('status')
+        limit = min(request.args.get('limit', 50, type=int), 200)
+
+        stmt = select(UploadJob)
+        if status:
+            stmt = stmt.where(UploadJob.status == status)
+
+        with read_only_session() as session:
+            jobs = session.execute(stmt.order_by(UploadJob.id.desc()).limit(limit)).scalars()
+            return jsonify({'jobs': [job.to_dict() for job in jobs]})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/upload-jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_upload_job(job_id):
+    """Get the status of a remote upload job"""
+    try:
+        job = UploadJob.query.get_or_404(job_id)
+        return jsonify(job.to_dict())
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/upload-jobs/<int:job_id>/retry', methods=['POST'])
+@token_required
+def retry_upload_job(job_id):
+    """Re-queue a failed remote upload job, or one abandoned by a dead worker"""
+    try:
+        job = UploadJob.query.get_or_404(job_id)
+        if job.status != 'failed' and not upload_queue.is_stale(job):
+            return jsonify({'error': 'Only failed or stale jobs can be retried'}), 400
+        upload_queue.retry(job)
+        return jsonify(job.to_dict()), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # Contact Messages Management
 @admin_bp.route('/admin/contact-messages', methods=['GET'])
 @token_required
 def get_contact_messages():
-    """Get all contact messages"""
+    """Get all contact messages.
+
+    Passing `cursor` (empty for the first page) or `limit` switches to keyset
+    pagination over (created_at, id), newest first.
+    """
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         status = request.args.get('status')
-
-        query = ContactMessage.query
-
-        if status:
-            query = query.filter(ContactMessage.status == status)
-
-        messages = query.order_by(ContactMessage.created_at.desc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        fields = contact_message_encoder.parse_fields(request.args.get('fields'))
+
+        where = [ContactMessage.status == status] if status else []
+        listing = Listing(ContactMessage, contact_message_encoder, where, fields)
+
+        if cursor is not None or limit is not None:
+            include_total = request.args.get('include_total') == '1'
+            messages, next_cursor, total = listing.keyset(
+                [ContactMessage.created_at, ContactMessage.id],
+                cursor=cursor, limit=limit or per_page, descending=True,
+                include_total=include_total
+            )
+            payload = {'messages': messages, 'next_cursor': next_cursor}
+            if include_total:
+                payload['total'] = total
+            return jsonify(payload)
+
+        messages, total, pages = listing.page(
+            page, per_page, [ContactMessage.created_at.desc(), ContactMessage.id.desc()]
         )
 
         return jsonify({
-            'messages': [message.to_dict() for message in messages.items],
-            'total': messages.total,
-            'pages': messages.pages,
+            'messages': messages,
+            'total': total,
+            'pages': pages,
             'current_page': page
         })
 
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -222,6 +371,7 @@ def update_contact_message(message_id):
 
         if 'status' in data:
             message.status = data['status']
+            replica_router.mark_write()
             db.session.commit()
 
         return jsonify(message.to_dict())
@@ -238,6 +388,7 @@ def delete_contact_message(message_id):
     try:
         message = ContactMessage.query.get_or_404(message_id)
         db.session.delete(message)
+        replica_router.mark_write()
         db.session.commit()
 
         return jsonify({'message': 'Contact message deleted successfully'})
@@ -247,6 +398,118 @@ def delete_contact_message(message_id):
         return jsonify({'error': str(e)}), 500
 
 
+# Bulk inbox operations
+BULK_CHUNK_SIZE = 500
+CONTACT_STATUSES = ('new', 'read', 'replied')
+
+
+def _filter_datetime(filters, name):
+    """Parse an ISO 8601 date or datetime from a bulk filter."""
+    value = filters[name]
+    try:
+        if not isinstance(value, str):
+            raise TypeError(value)
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+
+
+def _message_selection(data):
+    """Turn a bulk request body into a list of WHERE clause groups.
+
+    `ids` are split into chunks of BULK_CHUNK_SIZE so each statement stays
+    within driver parameter limits; a `filter` becomes a single clause group.
+    Raises ValueError when the body selects nothing or is malformed.
+    """
+    ids = data.get('ids')
+    filters = data.get('filter')
+    if ids and filters:
+        raise ValueError('Pass either ids or filter, not both')
+
+    if ids:
+        if not isinstance(ids, list):
+            raise ValueError('ids must be a list')
+        try:
+            ids = sorted({int(i) for i in ids})
+        except (TypeError, ValueError):
+            raise ValueError('ids must be integers')
+        return [[ContactMessage.id.in_(ids[i:i + BULK_CHUNK_SIZE])]
+                for i in range(0, len(ids), BULK_CHUNK_SIZE)]
+
+    if not filters or not isinstance(filters, dict):
+        raise ValueError('ids or filter is required')
+
+    clauses = []
+    if filters.get('status'):
+        clauses.append(ContactMessage.status == filters['status'])
+    if filters.get('email'):
+        clauses.append(ContactMessage.email == filters['email'])
+    if filters.get('created_from') is not None:
+        clauses.append(ContactMessage.created_at >= _filter_datetime(filters, 'created_from'))
+    if filters.get('created_to') is not None:
+        clauses.append(ContactMessage.created_at < _filter_datetime(filters, 'created_to'))
+    if not clauses:
+        raise ValueError('filter must include status, email, created_from or created_to')
+    return [clauses]
+
+
+@admin_bp.route('/admin/contact-messages/bulk-update', methods=['POST'])
+@token_required
+def bulk_update_contact_messages():
+    """Set the status of many contact messages in one transaction"""
+    try:
+        data = request.get_json(silent=True) or {}
+        status = data.get('status')
+        if status not in CONTACT_STATUSES:
+            return jsonify({'error': f"status must be one of {', '.join(CONTACT_STATUSES)}"}), 400
+
+        updated = 0
+        for clauses in _message_selection(data):
+            result = db.session.execute(
+                update(ContactMessage).where(*clauses).values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        replica_router.mark_write()
+        db.session.commit()
+
+        return jsonify({'updated': updated})
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/contact-messages/bulk-delete', methods=['POST'])
+@token_required
+def bulk_delete_contact_messages():
+    """Delete many contact messages in one transaction"""
+    try:
+        data = request.get_json(silent=True) or {}
+
+        deleted = 0
+        for clauses in _message_selection(data):
+            result = db.session.execute(
+                delete(ContactMessage).where(*clauses)
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+        replica_router.mark_write()
+        db.session.commit()
+
+        return jsonify({'deleted': deleted})
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # Seed/Init helpers (admin-only)
 @admin_bp.route('/admin/seed', methods=['POST'])
 @token_required
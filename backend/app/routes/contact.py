@@ -1,12 +1,29 @@
+import uuid
+
 from flask import Blueprint, request, jsonify
 from app.models.contact import ContactMessage
 from app import db
+from app.utils.contact_writer import QueueFull, contact_writer
 
 contact_bp = Blueprint('contact', __name__)
 
+
+def check_lengths(fields):
+    """Raise ValueError for values longer than their column allows."""
+    for name, value in fields.items():
+        length = getattr(ContactMessage.__table__.c[name].type, 'length', None)
+        if length and value and len(value) > length:
+            raise ValueError(f'{name} must be at most {length} characters')
+
+
 @contact_bp.route('/contact', methods=['POST'])
 def submit_contact():
-    """Submit a contact form message"""
+    """Submit a contact form message.
+
+    With CONTACT_WRITE_BEHIND enabled the message is journaled and queued and
+    the endpoint answers 202 with a receipt id; the row is inserted by the
+    background flusher.
+    """
     try:
         data = request.get_json()
         
@@ -18,22 +35,42 @@ def submit_contact():
             if field not in data or not data[field].strip():
                 return jsonify({'error': f'{field} is required'}), 400
         
-        contact_message = ContactMessage(
-            name=data['name'].strip(),
-            email=data['email'].strip(),
-            phone=data.get('phone', '').strip(),
-            subject=data['subject'].strip(),
-            message=data['message'].strip()
-        )
+        fields = {
+            'name': data['name'].strip(),
+            'email': data['email'].strip(),
+            'phone': (data.get('phone') or '').strip(),
+            'subject': data['subject'].strip(),
+            'message': data['message'].strip()
+        }
+        # Checked up front: a row the database rejects would otherwise only
+        # fail later, in the write-behind flusher.
+        check_lengths(fields)
+
+        if contact_writer.enabled:
+            try:
+                receipt_id = contact_writer.submit(fields)
+            except QueueFull:
+                response = jsonify({'error': 'Too many submissions, please retry shortly'})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            return jsonify({
+                'message': 'Contact form submitted successfully',
+                'receipt_id': receipt_id
+            }), 202
+
+        contact_message = ContactMessage(receipt_id=uuid.uuid4().hex, **fields)
         
         db.session.add(contact_message)
         db.session.commit()
         
         return jsonify({
             'message': 'Contact form submitted successfully',
-            'id': contact_message.id
+            'id': contact_message.id,
+            'receipt_id': contact_message.receipt_id
         }), 201
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,37 +1,315 @@
-from flask import Blueprint, request, jsonify
+import math
+
+from flask import Blueprint, abort, request, jsonify, current_app
+from sqlalchemy import select
 from app.models.product import Product
 from app import db
+from app.utils.cache import catalog_cache
+from app.utils.changes import changes_since
+from app.utils.facets import facet_counts, product_facet_counts
+from app.utils.listing import Listing, read_only_session
+from app.utils.search import search_products, search_terms
+from app.utils.serializers import product_encoder
+from app.utils.snapshot import catalog_snapshot
+from app.utils.http_cache import (
+    apply_cache_headers,
+    catalog_etag,
+    is_not_modified,
+    not_modified_response,
+)
 
 products_bp = Blueprint('products', __name__)
 
+TRUE_ARGS = {'1', 'true', 'yes', 'on'}
+FALSE_ARGS = {'0', 'false', 'no', 'off'}
+
+
+def bool_arg(name):
+    """Parse a boolean query parameter; None when absent.
+
+    Raises ValueError for anything but the usual true/false spellings.
+    """
+    value = (request.args.get(name) or '').strip().lower()
+    if not value:
+        return None
+    if value in TRUE_ARGS:
+        return True
+    if value in FALSE_ARGS:
+        return False
+    raise ValueError(f'{name} must be true or false')
+
+
+def price_arg(name):
+    """Parse a non-negative price query parameter; None when absent."""
+    value = (request.args.get(name) or '').strip()
+    if not value:
+        return None
+    try:
+        price = float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+    if not math.isfinite(price) or price < 0:
+        raise ValueError(f'{name} must be a non-negative number')
+    return price
+
+
+# `sort` value -> (keyset columns, descending). Every sort ends with id so the
+# order is total and cursors stay stable; the Product indexes cover each one.
+PRODUCT_SORTS = {
+    'id': ([Product.id], False),
+    'price': ([Product.price, Product.id], False),
+    '-price': ([Product.price, Product.id], True),
+    'newest': ([Product.created_at, Product.id], True),
+}
+
+
+def product_filters(category=None, featured=None, in_stock=None,
+                    min_price=None, max_price=None, sort='id'):
+    """WHERE clauses for the /products filters.
+
+    Unless sorting by price, the price range is written as `price + 0` so the
+    planner walks the index matching the sort and stops at LIMIT, instead of
+    range-scanning a price index and sorting every match.
+    """
+    where = []
+    if category:
+        where.append(Product.category == category)
+    if featured is not None:
+        where.append(Product.featured == featured)
+    if in_stock is not None:
+        where.append(Product.in_stock == in_stock)
+    price = Product.price if sort in ('price', '-price') else Product.price + 0
+    if min_price is not None:
+        where.append(price >= min_price)
+    if max_price is not None:
+        where.append(price <= max_price)
+    return where
+
+
+def cached_json_response(key, build_payload, from_snapshot=None):
+    """Serve `build_payload()` as JSON through the catalog cache.
+
+    The encoded body is cached, so a hit skips both the query and the
+    serialization; the compression hook reuses `key` to cache the compressed
+    body too. A GET or HEAD whose If-None-Match matches the current catalog
+    version gets an empty 304 before the cache is even consulted.
+
+    `from_snapshot(view)` may render the body straight from the shared
+    catalog snapshot instead; returning None falls back to the cache. With
+    `key` None the body is built per request and never cached.
+    """
+    etag = catalog_etag()
+    # A 304 only answers a conditional GET or HEAD, never e.g. a POST lookup.
+    if request.method in ('GET', 'HEAD') and is_not_modified(etag):
+        return not_modified_response(etag)
+
+    body = None
+    if from_snapshot is not None:
+        view = catalog_snapshot.current()
+        if view is not None:
+            body = from_snapshot(view)
+    if body is None:
+        load = lambda: current_app.json.response(build_payload()).get_data()
+        body = load() if key is None else catalog_cache.get_or_load(key, load)
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    if key is not None:
+        response.compression_cache_key = key
+    return apply_cache_headers(response, etag)
+
+
 @products_bp.route('/products', methods=['GET'])
 def get_products():
-    """Get all products with optional filtering"""
+    """Get all products with optional filtering.
+
+    Filters: `category`, `featured`, `in_stock`, `min_price`, `max_price`.
+    `sort` is `price`, `-price` or `newest` (default: id). Passing `cursor`
+    (empty for the first page) or `limit` switches to keyset pagination over
+    the sort columns, which returns `next_cursor` and skips the count query
+    unless `include_total=1` is given.
+    """
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 12, type=int)
         category = request.args.get('category')
-        featured = request.args.get('featured', type=bool)
-        
-        query = Product.query
-        
-        if category:
-            query = query.filter(Product.category == category)
-        if featured:
-            query = query.filter(Product.featured == True)
-        
-        products = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        return jsonify({
-            'products': [product.to_dict() for product in products.items],
-            'total': products.total,
-            'pages': products.pages,
-            'current_page': page
-        })
+        featured = bool_arg('featured')
+        in_stock = bool_arg('in_stock')
+        min_price = price_arg('min_price')
+        max_price = price_arg('max_price')
+        sort = request.args.get('sort') or 'id'
+        if sort not in PRODUCT_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(PRODUCT_SORTS)}")
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        include_total = request.args.get('include_total') == '1'
+        cursor_mode = cursor is not None or limit is not None
+        fields = product_encoder.parse_fields(request.args.get('fields'))
+        filters = (category, featured, in_stock, min_price, max_price, sort)
+
+        def build():
+            where = product_filters(*filters)
+            listing = Listing(Product, product_encoder, where, fields)
+            columns, descending = PRODUCT_SORTS[sort]
+
+            if cursor_mode:
+                items, next_cursor, total = listing.keyset(
+                    columns, cursor=cursor, limit=limit or per_page,
+                    descending=descending, include_total=include_total
+                )
+                payload = {'products': items, 'next_cursor': next_cursor}
+                if include_total:
+                    payload['total'] = total
+                return payload
+
+            order_by = [c.desc() if descending else c.asc() for c in columns]
+            items, total, pages = listing.page(page, per_page, order_by)
+            return {
+                'products': items,
+                'total': total,
+                'pages': pages,
+                'current_page': page
+            }
+
+        def from_snapshot(view):
+            # The snapshot only holds id-ordered category/featured lists.
+            if (fields or sort != 'id' or featured is False or in_stock is not None
+                    or min_price is not None or max_price is not None):
+                return None
+            if cursor_mode:
+                return catalog_snapshot.products_keyset(
+                    view, cursor, limit or per_page, include_total, category, featured
+                )
+            return catalog_snapshot.products_page(view, page, per_page, category, featured)
+
+        if cursor_mode:
+            key = ('products', 'cursor', cursor, limit or per_page, include_total, filters, fields)
+        else:
+            key = ('products', page, per_page, filters, fields)
+        return cached_json_response(key, build, from_snapshot)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@products_bp.route('/products/search', methods=['GET'])
+def search():
+    """Full-text search over product names and descriptions"""
+    try:
+        q = request.args.get('q', '')
+        category = request.args.get('category')
+        featured = bool_arg('featured')
+        limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+        fields = product_encoder.parse_fields(request.args.get('fields'))
+
+        if not search_terms(q):
+            return jsonify({'error': 'q is required'}), 400
+
+        def build():
+            where = product_filters(category, featured)
+            listing = Listing(
+                Product, product_encoder, where, fields,
+                refine=lambda stmt: search_products(stmt, q, db.engine.dialect.name)
+            )
+            return {'products': listing.all(limit=limit), 'query': q}
+
+        # The raw query, not its terms: the payload echoes it back.
+        key = ('search', q, category, featured, limit, fields)
+        return cached_json_response(key, build)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def parse_lookup_ids(raw):
+    """Parse `1,5,9` or a JSON list into unique ids, keeping their order.
+
+    Raises ValueError for malformed ids or more than PRODUCT_LOOKUP_MAX_IDS.
+    """
+    if isinstance(raw, str):
+        raw = [part for part in raw.split(',') if part.strip()]
+    if not isinstance(raw, list) or not raw:
+        raise ValueError('ids is required')
+    ids = []
+    for value in raw:
+        if isinstance(value, bool):
+            raise ValueError(f'Invalid product id: {value}')
+        try:
+            product_id = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid product id: {value}')
+        if product_id not in ids:
+            ids.append(product_id)
+    max_ids = current_app.config.get('PRODUCT_LOOKUP_MAX_IDS', 100)
+    if len(ids) > max_ids:
+        raise ValueError(f'At most {max_ids} ids per lookup')
+    return ids
+
+@products_bp.route('/products/lookup', methods=['GET', 'POST'])
+def lookup_products():
+    """Fetch several products by id in one query.
+
+    Takes `?ids=1,5,9` or a JSON body `{"ids": [1, 5, 9]}` and returns the
+    products found, in request order, plus the ids that do not exist.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            raw_ids = data.get('ids')
+            raw_fields = data.get('fields') or request.args.get('fields')
+        else:
+            raw_ids = request.args.get('ids', '')
+            raw_fields = request.args.get('fields')
+        ids = parse_lookup_ids(raw_ids)
+        fields = product_encoder.parse_fields(raw_fields)
+        if fields and 'id' not in fields:
+            # Needed to match rows to ids, so it is always returned.
+            fields = ('id',) + fields
+
+        def build():
+            items = Listing(Product, product_encoder, [Product.id.in_(ids)], fields).all()
+            by_id = {item['id']: item for item in items}
+            return {
+                'products': [by_id[i] for i in ids if i in by_id],
+                'missing': [i for i in ids if i not in by_id],
+            }
+
+        def from_snapshot(view):
+            return None if fields else catalog_snapshot.products_by_id(view, ids)
+
+        # Id sets rarely repeat, so cached entries would only evict hot ones;
+        # when the snapshot cannot answer, the primary-key query runs uncached.
+        return cached_json_response(None, build, from_snapshot)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@products_bp.route('/products/changes', methods=['GET'])
+def get_changes():
+    """Products created or updated, and ids deleted, after change version `since`.
+
+    Clients keep a local copy and pass the returned `version` as the next
+    `since`, repeating while `has_more` is true. `since=0` returns the whole
+    catalog; without `since` only the current version is returned.
+    """
+    try:
+        since = (request.args.get('since') or '').strip()
+        if since and not since.isdigit():
+            raise ValueError('since must be a non-negative integer')
+        since = int(since) if since else None
+        max_limit = current_app.config.get('PRODUCT_CHANGES_MAX_LIMIT', 1000)
+        limit = max(1, min(request.args.get('limit', 500, type=int), max_limit))
+        fields = product_encoder.parse_fields(request.args.get('fields'))
+        if fields and 'id' not in fields:
+            # Needed to apply the change on the client, so it is always returned.
+            fields = ('id',) + fields
+
+        def build():
+            with read_only_session() as session:
+                return changes_since(session, since, limit, fields)
+
+        return cached_json_response(('changes', since, limit, fields), build)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -39,8 +317,20 @@ def get_products():
 def get_product(product_id):
     """Get a specific product by ID"""
     try:
-        product = Product.query.get_or_404(product_id)
-        return jsonify(product.to_dict())
+        fields = product_encoder.parse_fields(request.args.get('fields'))
+
+        def build():
+            items = Listing(Product, product_encoder, [Product.id == product_id], fields).all()
+            if not items:
+                abort(404)
+            return items[0]
+
+        def from_snapshot(view):
+            return None if fields else catalog_snapshot.product(view, product_id)
+
+        return cached_json_response(('product', product_id, fields), build, from_snapshot)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -48,7 +338,36 @@ def get_product(product_id):
 def get_categories():
     """Get all unique product categories"""
     try:
-        categories = db.session.query(Product.category).distinct().all()
-        return jsonify([cat[0] for cat in categories])
+        def build():
+            # The facet summary has a row per category, see app/utils/facets.py.
+            stmt = select(product_facet_counts.c.category).distinct().order_by(product_facet_counts.c.category)
+            with read_only_session() as session:
+                categories = session.execute(stmt).all()
+            return [cat[0] for cat in categories]
+
+        return cached_json_response(('categories',), build, catalog_snapshot.categories)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@products_bp.route('/products/facets', methods=['GET'])
+def get_facets():
+    """Category, featured, in-stock and price-range counts for a filter.
+
+    Reads the incrementally maintained facet summary rather than scanning
+    products; each facet ignores its own filter, see facet_counts().
+    """
+    try:
+        category = request.args.get('category') or None
+        featured = bool_arg('featured')
+        in_stock = bool_arg('in_stock')
+
+        def build():
+            with read_only_session() as session:
+                rows = session.execute(select(product_facet_counts)).all()
+            return facet_counts(rows, category, featured, in_stock)
+
+        return cached_json_response(('facets', category, featured, in_stock), build)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
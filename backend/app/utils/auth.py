@@ -2,6 +2,13 @@ from functools import wraps
 from flask import request, jsonify
 from flask import current_app
 
+def is_admin_request():
+    """True if the current request carries the admin token."""
+    token = request.headers.get('Authorization', '')
+    if token.startswith('Bearer '):
+        token = token[7:]
+    return bool(token) and token == current_app.config['ADMIN_TOKEN']
+
 def token_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.db_routing import replica_router
+
+# How long a caller waits for another caller's refill before loading itself.
+LOAD_WAIT_TIMEOUT = 10
+
+
+class _Entry:
+    __slots__ = ('version', 'value', 'stored_at')
+
+    def __init__(self, version, value, stored_at):
+        self.version = version
+        self.value = value
+        self.stored_at = stored_at
+
+
+class CatalogVersion:
+    """Catalog version counter shared by every worker on the host.
+
+    The version lives in a small file so that a bump in one gunicorn worker
+    invalidates the caches of all the others. Reads only `stat` the file and
+    re-read it when its mtime changes.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._lock = threading.RLock()
+        self._mtime = None
+        self._value = 0
+
+    def init_app(self, app):
+        self.path = app.config.get('CATALOG_VERSION_FILE')
+        self._mtime = None
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if not os.path.exists(self.path):
+                self._write(time.time_ns() // 1000)
+
+    def get(self):
+        if not self.path:
+            return self._value
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._value
+        if mtime != self._mtime:
+            with self._lock:
+                try:
+                    with open(self.path) as fh:
+                        self._value = int(fh.read().strip() or 0)
+                    self._mtime = mtime
+                except (OSError, ValueError):
+                    pass
+        return self._value
+
+    def bump(self):
+        """Advance the version and return the new value."""
+        with self._lock:
+            # Wall clock based so the version stays monotonic across restarts
+            # even if the version file is lost.
+            value = max(self.get() + 1, time.time_ns() // 1000)
+            if self.path:
+                self._write(value)
+            self._value = value
+            return value
+
+    def _write(self, value):
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as fh:
+            fh.write(str(value))
+        os.replace(tmp_path, self.path)
+        self._value = value
+
+
+class CatalogCache:
+    """Bounded LRU cache for serialized catalog responses.
+
+    Entries are tagged with the catalog version they were built from and are
+    considered fresh while that version is current and `ttl` has not elapsed.
+    Expired entries of the current version younger than `ttl + stale_ttl` are
+    still handed out to concurrent callers while a single caller refills the
+    key, so a miss under load runs the loader once instead of once per
+    request. After a version bump, concurrent callers wait for the refill.
+    """
+
+    def __init__(self, max_entries=256, ttl=300, stale_ttl=30):
+        self.enabled = True
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('CATALOG_CACHE_ENABLED', True)
+        self.max_entries = app.config.get('CATALOG_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', self.ttl)
+        self.stale_ttl = app.config.get('CATALOG_CACHE_STALE_TTL', self.stale_ttl)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss."""
+        if not self.enabled:
+            return loader()
+
+        version = catalog_version.get()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if entry.version == version and age < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry.value
+
+            event = self._inflight.get(key)
+            if event is None:
+                event = threading.Event()
+                self._inflight[key] = event
+                leader = True
+            else:
+                leader = False
+                if (entry is not None and entry.version == version
+                        and age < self.ttl + self.stale_ttl):
+                    # Someone is already refilling this key; serve the expired
+                    # entry. Entries of an older catalog version are never
+                    # served, the caller's ETag already names the new version.
+                    return entry.value
+
+        if not leader:
+            event.wait(timeout=LOAD_WAIT_TIMEOUT)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    return entry.value
+            return loader()
+
+        try:
+            value = loader()
+            with self._lock:
+                self._entries[key] = _Entry(version, value, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+
+catalog_version = CatalogVersion()
+catalog_cache = CatalogCache()
+
+# Called with the new version after every bump, see on_catalog_bump().
+_bump_listeners = []
+
+
+def on_catalog_bump(listener):
+    """Register `listener(version)` to run after each catalog version bump."""
+    if listener not in _bump_listeners:
+        _bump_listeners.append(listener)
+    return listener
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response.
+
+    Reads are pinned to the primary first, so a cache refill under the new
+    version can never come from a replica that has not seen the write yet.
+    """
+    replica_router.mark_write()
+    version = catalog_version.bump()
+    for listener in _bump_listeners:
+        listener(version)
+    return version
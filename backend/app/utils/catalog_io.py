@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+import math
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+
+from app import db
+from app.models.product import Product
+from app.utils.cache import bump_catalog_version
+from app.utils.images import cloudinary_variants
+from app.utils.listing import read_only_session
+
+EXPORT_FIELDS = ['id', 'name', 'description', 'price', 'category', 'image_url',
+                 'in_stock', 'featured', 'created_at', 'updated_at']
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+
+def export_rows(batch_size=500):
+    """Yield products one at a time from a server-side cursor."""
+    stmt = select(Product).order_by(Product.id).execution_options(yield_per=batch_size)
+    with read_only_session() as session:
+        for product in session.execute(stmt).scalars():
+            yield product
+            # Nothing is modified, so drop rows from the identity map as we go.
+            session.expunge(product)
+
+
+def export_ndjson(batch_size=500):
+    for product in export_rows(batch_size):
+        yield current_app.json.dumps(product.to_dict(), separators=(',', ':')) + '\n'
+
+
+def export_csv(batch_size=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for product in export_rows(batch_size):
+        data = product.to_dict()
+        writer.writerow([data[field] for field in EXPORT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def parse_rows(stream, fmt):
+    """Yield dicts from an NDJSON or CSV byte stream without buffering it.
+
+    Malformed NDJSON lines are yielded as ValueError instances so they are
+    reported against their line number instead of aborting the import. Input
+    that cannot be decoded or parsed as CSV ends the stream with one final
+    ValueError, keeping the results of the rows before it.
+    """
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8',
+                            newline='' if fmt == 'csv' else None)
+    try:
+        yield from _parse_text(text, fmt)
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield ValueError(f'Import stopped, unreadable input: {e}')
+
+
+def _parse_text(text, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield ValueError('Invalid JSON')
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def validate_row(raw):
+    """Normalize one import row; raises ValueError with a readable message."""
+    if isinstance(raw, Exception):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError('Row must be an object')
+
+    row = {}
+    for field in ('name', 'category'):
+        value = raw.get(field)
+        if value is None or not str(value).strip():
+            raise ValueError(f'{field} is required')
+        row[field] = str(value).strip()
+    try:
+        row['price'] = float(raw.get('price'))
+    except (TypeError, ValueError):
+        raise ValueError('price must be a number')
+    if not math.isfinite(row['price']):
+        raise ValueError('price must be a finite number')
+    if row['price'] < 0:
+        raise ValueError('price must not be negative')
+
+    row['description'] = str(raw.get('description') or '').strip()
+    row['image_url'] = str(raw.get('image_url') or '').strip()
+    row['image_variants'] = cloudinary_variants(row['image_url'])
+    row['in_stock'] = _to_bool(raw.get('in_stock', True))
+    row['featured'] = _to_bool(raw.get('featured', False))
+    return row
+
+
+def _write_batch(batch, results):
+    """Upsert one batch of (line, row) pairs in a single transaction."""
+    names = {row['name'] for _, row in batch}
+    image_urls = {}
+    existing = {}
+    for name, product_id, image_url in db.session.execute(
+            select(Product.name, Product.id, Product.image_url).where(Product.name.in_(names))):
+        existing[name] = product_id
+        image_urls[name] = image_url or ''
+
+    # Rows sharing a name collapse into one write; the last row wins.
+    inserts, updates, statuses = {}, {}, []
+    for line, row in batch:
+        name = row['name']
+        if name in existing:
+            updates[name] = dict(row, id=existing[name])
+            if row['image_url'] == image_urls[name]:
+                # Same image: keep its variants, which may have been
+                # generated locally and are not in the import.
+                del updates[name]['image_variants']
+            statuses.append((line, 'updated', name))
+        elif name in inserts:
+            inserts[name] = row
+            statuses.append((line, 'updated', name))
+        else:
+            inserts[name] = row
+            statuses.append((line, 'created', name))
+
+    try:
+        if inserts:
+            new_ids = db.session.execute(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                list(inserts.values())
+            ).scalars()
+            existing.update(zip(inserts.keys(), new_ids))
+        if updates:
+            db.session.execute(update(Product), list(updates.values()))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for line, _, _ in statuses:
+            results.append({'line': line, 'status': 'error', 'error': str(e)})
+        return 0
+
+    for line, status, name in statuses:
+        results.append({'line': line, 'status': status, 'id': existing[name]})
+    return len(statuses)
+
+
+def import_rows(rows, batch_size=500):
+    """Validate and upsert rows in batched transactions.
+
+    Rows are matched to existing products by name, the catalog's natural key.
+    Returns per-row results in input order, summary counts and the number of
+    rows written. The catalog version is bumped whenever anything was
+    written, even if the import then fails.
+    """
+    results = []
+    batch = []
+    written = 0
+    try:
+        for line, raw in enumerate(rows, start=1):
+            try:
+                batch.append((line, validate_row(raw)))
+            except ValueError as e:
+                results.append({'line': line, 'status': 'error', 'error': str(e)})
+            if len(batch) >= batch_size:
+                written += _write_batch(batch, results)
+                batch = []
+        if batch:
+            written += _write_batch(batch, results)
+    finally:
+        if written:
+            bump_catalog_version()
+
+    results.sort(key=lambda r: r['line'])
+    summary = {'created': 0, 'updated': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return results, summary, written
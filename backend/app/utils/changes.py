@@ -0,0 +1,116 @@
+from sqlalchemy import column, func, select, table
+
+from app.models.product import Product
+from app.utils.ddl import create_after
+from app.utils.serializers import product_encoder
+
+# product_changes is the catalog change log behind /products/changes: one row
+# per product holding the change version of its latest insert, update or
+# delete (deleted rows are kept as tombstones). Triggers replace a product's
+# row with a new, higher version on every write, whatever the write path.
+product_changes = table(
+    'product_changes',
+    column('version'), column('product_id'), column('deleted'),
+)
+
+
+def _record_sql(row, deleted):
+    return (f"DELETE FROM product_changes WHERE product_id = {row}.id; "
+            f"INSERT INTO product_changes (product_id, deleted) VALUES ({row}.id, {deleted})")
+
+
+def _backfill_sql(false):
+    # Existing products count as created, so `since=0` returns the whole catalog.
+    return (f"INSERT INTO product_changes (product_id, deleted) "
+            f"SELECT id, {false} FROM products WHERE id NOT IN "
+            f"(SELECT product_id FROM product_changes) ORDER BY id")
+
+
+SQLITE_CHANGES_DDL = [
+    # AUTOINCREMENT never reuses a version, even after the newest row is replaced.
+    "CREATE TABLE IF NOT EXISTS product_changes ("
+    "version INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "product_id INTEGER NOT NULL UNIQUE, "
+    "deleted BOOLEAN NOT NULL)",
+    "CREATE TRIGGER IF NOT EXISTS product_changes_ai AFTER INSERT ON products BEGIN "
+    f"{_record_sql('new', 0)}; END",
+    "CREATE TRIGGER IF NOT EXISTS product_changes_au AFTER UPDATE ON products BEGIN "
+    f"{_record_sql('new', 0)}; END",
+    "CREATE TRIGGER IF NOT EXISTS product_changes_ad AFTER DELETE ON products BEGIN "
+    f"{_record_sql('old', 1)}; END",
+    _backfill_sql(0),
+]
+
+POSTGRES_CHANGES_DDL = [
+    "CREATE TABLE IF NOT EXISTS product_changes ("
+    "version BIGSERIAL PRIMARY KEY, "
+    "product_id INTEGER NOT NULL UNIQUE, "
+    "deleted BOOLEAN NOT NULL)",
+    # Writers take a transaction-level lock before drawing a version, so
+    # versions become visible in commit order and a reader that has seen
+    # version N can never later find a smaller one appear.
+    "CREATE OR REPLACE FUNCTION product_changes_record() RETURNS trigger AS $$ BEGIN "
+    "PERFORM pg_advisory_xact_lock(hashtext('product_changes')); "
+    "IF TG_OP = 'DELETE' THEN "
+    f"{_record_sql('OLD', 'true')}; "
+    "ELSE "
+    f"{_record_sql('NEW', 'false')}; "
+    "END IF; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS product_changes_record ON products",
+    "CREATE TRIGGER product_changes_record "
+    "AFTER INSERT OR UPDATE OR DELETE ON products "
+    "FOR EACH ROW EXECUTE FUNCTION product_changes_record()",
+    _backfill_sql('false'),
+]
+
+SQLITE_CHANGES_DROP = [
+    "DROP TRIGGER IF EXISTS product_changes_ad",
+    "DROP TRIGGER IF EXISTS product_changes_au",
+    "DROP TRIGGER IF EXISTS product_changes_ai",
+    "DROP TABLE IF EXISTS product_changes",
+]
+
+POSTGRES_CHANGES_DROP = [
+    "DROP TRIGGER IF EXISTS product_changes_record ON products",
+    "DROP FUNCTION IF EXISTS product_changes_record()",
+    "DROP TABLE IF EXISTS product_changes",
+]
+
+create_after(Product.__table__, SQLITE_CHANGES_DDL, POSTGRES_CHANGES_DDL)
+
+
+def changes_since(session, since, limit, fields=None):
+    """Build the /products/changes payload for changes after version `since`.
+
+    Returns up to `limit` changed products and deleted ids in version order.
+    `version` is the version to pass as `since` next time; with `since` None
+    only the current version is returned, so a client can start following
+    the log from now.
+    """
+    if since is not None:
+        names = list(fields or product_encoder.fields)
+        stmt = (
+            select(product_changes.c.version, product_changes.c.product_id,
+                   product_changes.c.deleted, *[getattr(Product, name) for name in names])
+            .select_from(product_changes)
+            .outerjoin(Product, Product.id == product_changes.c.product_id)
+            .where(product_changes.c.version > since)
+            .order_by(product_changes.c.version)
+            .limit(limit + 1)
+        )
+        rows = session.execute(stmt).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            return {
+                'products': product_encoder.encode_many([r for r in rows if not r.deleted], fields),
+                'deleted': [r.product_id for r in rows if r.deleted],
+                'version': rows[-1].version,
+                'has_more': has_more,
+            }
+
+    # Nothing newer. A version below `since` means the log was reset (e.g. a
+    # new database) and the client should fetch everything again.
+    version = session.execute(select(func.max(product_changes.c.version))).scalar() or 0
+    return {'products': [], 'deleted': [], 'version': version, 'has_more': False}
@@ -0,0 +1,95 @@
+import gzip
+import hashlib
+
+from flask import current_app, request
+
+from app.utils.cache import catalog_cache
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/html',
+    'text/plain',
+    'image/svg+xml',
+}
+
+# Cached catalog bodies are compressed once per catalog version, so they can
+# afford the slowest, smallest settings.
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 11
+
+ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gz'}
+
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, cached=False):
+    if encoding == 'br':
+        quality = CACHED_BROTLI_QUALITY if cached else current_app.config.get('COMPRESS_BROTLI_QUALITY', 5)
+        return brotli.compress(data, quality=quality)
+    level = CACHED_GZIP_LEVEL if cached else current_app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_response(response):
+    """after_request hook: gzip/Brotli-encode eligible responses.
+
+    Responses that carry a `compression_cache_key` (set by the catalog
+    endpoints) reuse compressed bytes from the catalog cache, so each
+    distinct body is compressed once per catalog version.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config.get('COMPRESS_MIN_SIZE', 500):
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    cache_key = getattr(response, 'compression_cache_key', None)
+    if cache_key is not None:
+        # Keyed on the body itself, not the route's cache key, so compressed
+        # bytes are only ever reused for exactly the body they came from.
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        compressed = catalog_cache.get_or_load(
+            ('compressed', encoding, digest),
+            lambda: compress(data, encoding, cached=True)
+        )
+    else:
+        compressed = compress(data, encoding)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + ETAG_SUFFIXES[encoding], weak)
+    return response
+
+
+def init_compression(app):
+    if app.config.get('COMPRESS_ENABLED', True):
+        app.after_request(compress_response)
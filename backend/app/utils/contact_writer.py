@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app import db
+from app.models.contact import ContactMessage
+from app.utils.workers import WorkerThread, pid_alive
+
+# Records per journal segment before a new one is started.
+SEGMENT_MAX_RECORDS = 5000
+
+
+class QueueFull(Exception):
+    """Raised when the write-behind queue cannot take another message."""
+
+
+class ContactWriteBehind:
+    """Buffers contact submissions and stores them in batched inserts.
+
+    Each accepted message is appended to a local journal segment before it is
+    queued, so a crash loses nothing: segments left behind by a dead process
+    are replayed on the next start. Replay is idempotent because every message
+    carries a unique `receipt_id`. A background thread drains the queue every
+    CONTACT_FLUSH_INTERVAL seconds or CONTACT_FLUSH_SIZE messages, whichever
+    comes first, and deletes segments once all their messages are stored.
+    Messages the database rejects are moved to CONTACT_DEAD_LETTER_FILE so
+    that one bad row cannot hold up the rest.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._queue = None
+        self._lock = threading.Lock()
+        self._flusher = WorkerThread(self._run, 'contact-flusher')
+        self._segment = None
+        self._segment_path = None
+        self._segment_records = 0
+        self._pending = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('CONTACT_WRITE_BEHIND', False)
+        self.journal_dir = app.config.get('CONTACT_JOURNAL_DIR')
+        self.flush_size = app.config.get('CONTACT_FLUSH_SIZE', 100)
+        self.flush_interval = app.config.get('CONTACT_FLUSH_INTERVAL', 0.5)
+        self.fsync = app.config.get('CONTACT_JOURNAL_FSYNC', True)
+        self.dead_letter_file = app.config.get('CONTACT_DEAD_LETTER_FILE')
+        if self.enabled:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            os.makedirs(os.path.dirname(self.dead_letter_file), exist_ok=True)
+            self._queue = queue.Queue(maxsize=app.config.get('CONTACT_QUEUE_SIZE', 1000))
+            threading.Thread(target=self._replay_at_start, name='contact-replay', daemon=True).start()
+
+    def submit(self, fields):
+        """Journal and queue a validated message; returns its receipt id."""
+        receipt_id = uuid.uuid4().hex
+        record = dict(fields, receipt_id=receipt_id, created_at=datetime.utcnow().isoformat())
+        with self._lock:
+            if self._queue.full():
+                raise QueueFull()
+            self._flusher.ensure_started()
+            path = self._append(record)
+            self._pending[path] = self._pending.get(path, 0) + 1
+            self._queue.put_nowait((path, record))
+        return receipt_id
+
+    def _append(self, record):
+        if self._segment is None or self._segment_records >= SEGMENT_MAX_RECORDS:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment_path = os.path.join(self.journal_dir, f'{os.getpid()}-{time.time_ns()}.jsonl')
+            self._segment = open(self._segment_path, 'a', encoding='utf-8')
+            self._segment_records = 0
+        self._segment.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+        self._segment_records += 1
+        return self._segment_path
+
+    def _replay_at_start(self):
+        try:
+            self.replay_orphaned_segments()
+        except Exception as e:
+            self.app.logger.error(f'Contact journal replay failed: {e}')
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush_with_retry(batch)
+
+    def _flush_with_retry(self, batch):
+        # Only transient failures (e.g. the database being down) are retried;
+        # rejected rows are dead-lettered by _store().
+        delay = self.flush_interval or 0.1
+        while True:
+            try:
+                self._store([record for _, record in batch])
+                break
+            except Exception as e:
+                self.app.logger.error(f'Contact flush of {len(batch)} messages failed: {e}')
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+        with self._lock:
+            for path, _ in batch:
+                self._pending[path] -= 1
+            for path, count in list(self._pending.items()):
+                if count == 0 and path != self._segment_path:
+                    del self._pending[path]
+                    os.remove(path)
+
+    def _store(self, records):
+        """Insert records, falling back to one at a time if the batch is rejected."""
+        try:
+            self._insert(records)
+        except (DataError, IntegrityError):
+            for record in records:
+                try:
+                    self._insert([record])
+                except (DataError, IntegrityError) as e:
+                    self._dead_letter(record, e)
+
+    def _dead_letter(self, record, error):
+        # The driver error only: the full exception would log the message itself.
+        reason = str(getattr(error, 'orig', error))
+        self.app.logger.error(f"Contact message {record['receipt_id']} rejected, "
+                              f"moved to {self.dead_letter_file}: {reason}")
+        entry = {'failed_at': datetime.utcnow().isoformat(), 'error': reason, 'record': record}
+        with open(self.dead_letter_file, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _insert(self, records):
+        """Insert records not stored yet, as one multi-row INSERT."""
+        with self.app.app_context():
+            try:
+                receipt_ids = [r['receipt_id'] for r in records]
+                stored = set(db.session.execute(
+                    select(ContactMessage.receipt_id).where(ContactMessage.receipt_id.in_(receipt_ids))
+                ).scalars())
+                rows = [dict(r, created_at=datetime.fromisoformat(r['created_at']))
+                        for r in records if r['receipt_id'] not in stored]
+                if rows:
+                    db.session.execute(insert(ContactMessage), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def replay_orphaned_segments(self):
+        """Store messages from journal segments of processes that have exited.
+
+        Covers both segments whose writer died and segments claimed for
+        replay (`<segment>.replay-<pid>`) by a process that died mid-replay.
+        """
+        for name in sorted(os.listdir(self.journal_dir)):
+            segment, _, claimer = name.partition('.replay-')
+            if not segment.endswith('.jsonl'):
+                continue
+            try:
+                # The process that owns the file: its writer, or its replayer.
+                pid = int(claimer or segment.split('-', 1)[0])
+            except ValueError:
+                continue
+            path = os.path.join(self.journal_dir, segment)
+            with self._lock:
+                if path == self._segment_path or path in self._pending:
+                    continue
+            # A file named after our own pid is left over from an earlier
+            # process that happened to have the same pid.
+            if pid != os.getpid() and pid_alive(pid):
+                continue
+            claimed = f'{path}.replay-{os.getpid()}'
+            try:
+                # Claim the segment so that only one worker replays it.
+                os.rename(os.path.join(self.journal_dir, name), claimed)
+            except OSError:
+                continue
+            records = []
+            with open(claimed, encoding='utf-8') as fh:
+                for line in fh:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        pass  # torn final line from the crash
+            try:
+                for start in range(0, len(records), self.flush_size):
+                    self._store(records[start:start + self.flush_size])
+            except Exception:
+                # Release the segment so a later start retries it; stored
+                # messages are skipped by receipt id.
+                os.rename(claimed, path)
+                raise
+            os.remove(claimed)
+            self.app.logger.info(f'Replayed {len(records)} contact messages from {name}')
+
+
+contact_writer = ContactWriteBehind()
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from app import db
+
+
+class ReplicaRouter:
+    """Chooses the engine for read-only work.
+
+    Reads go to the `replica` bind when one is configured, except within
+    REPLICA_STICKY_SECONDS of the last write. Every catalog version bump
+    counts as a write. The write time is kept in a marker file (its mtime)
+    so every worker on the host sees it.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.sticky_seconds = 0
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def init_app(self, app):
+        self.path = app.config.get('DB_WRITE_MARKER_FILE')
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self._last_write = 0.0
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def mark_write(self):
+        now = time.time()
+        self._last_write = now
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                with open(self.path, 'a'):
+                    pass
+                os.utime(self.path, (now, now))
+            except OSError:
+                pass
+
+    def last_write(self):
+        if self.path:
+            try:
+                return max(self._last_write, os.stat(self.path).st_mtime)
+            except OSError:
+                pass
+        return self._last_write
+
+    def read_engine(self):
+        """The replica engine, or the primary if there is none or we are sticky."""
+        replica = db.engines.get('replica')
+        if replica is None or time.time() - self.last_write() < self.sticky_seconds:
+            return db.engine
+        return replica
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,13 @@
+from sqlalchemy import DDL, event
+
+
+def create_after(table, sqlite, postgres):
+    """Run raw DDL for the current dialect whenever `table` is created."""
+    for dialect, statements in (('sqlite', sqlite), ('postgresql', postgres)):
+        for statement in statements:
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect=dialect))
+
+
+def dialect_statements(bind, sqlite, postgres):
+    """Pick the statements for `bind`'s dialect; other dialects get none."""
+    return {'sqlite': sqlite, 'postgresql': postgres}.get(bind.dialect.name, [])
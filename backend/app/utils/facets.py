@@ -0,0 +1,153 @@
+from sqlalchemy import column, table
+
+from app.models.product import Product
+from app.utils.ddl import create_after
+
+# Lower bounds of the price histogram buckets; the last one is open-ended.
+PRICE_BUCKET_EDGES = (0, 100, 250, 500, 1000, 2500, 5000)
+
+# product_facet_counts holds one row per (category, featured, in_stock,
+# price bucket) with the number of products in it. Triggers keep it in step
+# with products on every write path (ORM, bulk import, seeding), so facet
+# requests read a few dozen rows instead of grouping the whole table.
+product_facet_counts = table(
+    'product_facet_counts',
+    column('category'), column('featured'), column('in_stock'),
+    column('price_bucket'), column('product_count'),
+)
+
+_CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS product_facet_counts ("
+    "category VARCHAR(100) NOT NULL, "
+    "featured BOOLEAN NOT NULL, "
+    "in_stock BOOLEAN NOT NULL, "
+    "price_bucket INTEGER NOT NULL, "
+    "product_count INTEGER NOT NULL, "
+    "PRIMARY KEY (category, featured, in_stock, price_bucket))"
+)
+
+
+def _bucket_sql(price):
+    whens = ' '.join(f'WHEN {price} < {edge} THEN {i - 1}'
+                     for i, edge in enumerate(PRICE_BUCKET_EDGES) if i)
+    return f'CASE {whens} ELSE {len(PRICE_BUCKET_EDGES) - 1} END'
+
+
+def _key_sql(row, false):
+    """category, featured, in_stock, price_bucket of `row` (new/old/products)."""
+    return (f'{row}.category, coalesce({row}.featured, {false}), '
+            f'coalesce({row}.in_stock, {false}), {_bucket_sql(f"{row}.price")}')
+
+
+def _increment_sql(row, false):
+    return (f"INSERT INTO product_facet_counts "
+            f"(category, featured, in_stock, price_bucket, product_count) "
+            f"VALUES ({_key_sql(row, false)}, 1) "
+            f"ON CONFLICT (category, featured, in_stock, price_bucket) "
+            f"DO UPDATE SET product_count = product_facet_counts.product_count + 1")
+
+
+def _decrement_sql(row, false):
+    return (f"UPDATE product_facet_counts SET product_count = product_count - 1 "
+            f"WHERE (category, featured, in_stock, price_bucket) = "
+            f"({_key_sql(row, false)})")
+
+
+def _rebuild_sql(false):
+    return [
+        "DELETE FROM product_facet_counts",
+        f"INSERT INTO product_facet_counts "
+        f"(category, featured, in_stock, price_bucket, product_count) "
+        f"SELECT {_key_sql('products', false)}, count(*) FROM products "
+        f"GROUP BY 1, 2, 3, 4",
+    ]
+
+
+SQLITE_FACETS_DDL = [
+    _CREATE_TABLE,
+    "CREATE TRIGGER IF NOT EXISTS product_facets_ai AFTER INSERT ON products BEGIN "
+    f"{_increment_sql('new', 0)}; END",
+    "CREATE TRIGGER IF NOT EXISTS product_facets_ad AFTER DELETE ON products BEGIN "
+    f"{_decrement_sql('old', 0)}; "
+    "DELETE FROM product_facet_counts WHERE product_count <= 0; END",
+    "CREATE TRIGGER IF NOT EXISTS product_facets_au "
+    "AFTER UPDATE OF category, featured, in_stock, price ON products BEGIN "
+    f"{_decrement_sql('old', 0)}; "
+    f"{_increment_sql('new', 0)}; "
+    "DELETE FROM product_facet_counts WHERE product_count <= 0; END",
+] + _rebuild_sql(0)
+
+POSTGRES_FACETS_DDL = [
+    _CREATE_TABLE,
+    "CREATE OR REPLACE FUNCTION product_facets_sync() RETURNS trigger AS $$ BEGIN "
+    "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+    f"{_decrement_sql('OLD', 'false')}; "
+    "END IF; "
+    "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+    f"{_increment_sql('NEW', 'false')}; "
+    "END IF; "
+    "DELETE FROM product_facet_counts WHERE product_count <= 0; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS product_facets_sync ON products",
+    "CREATE TRIGGER product_facets_sync "
+    "AFTER INSERT OR DELETE OR UPDATE OF category, featured, in_stock, price ON products "
+    "FOR EACH ROW EXECUTE FUNCTION product_facets_sync()",
+] + _rebuild_sql('false')
+
+SQLITE_FACETS_DROP = [
+    "DROP TRIGGER IF EXISTS product_facets_au",
+    "DROP TRIGGER IF EXISTS product_facets_ad",
+    "DROP TRIGGER IF EXISTS product_facets_ai",
+    "DROP TABLE IF EXISTS product_facet_counts",
+]
+
+POSTGRES_FACETS_DROP = [
+    "DROP TRIGGER IF EXISTS product_facets_sync ON products",
+    "DROP FUNCTION IF EXISTS product_facets_sync()",
+    "DROP TABLE IF EXISTS product_facet_counts",
+]
+
+create_after(Product.__table__, SQLITE_FACETS_DDL, POSTGRES_FACETS_DDL)
+
+
+def price_ranges():
+    """(min, max) of each price bucket; max is None for the last one."""
+    edges = list(PRICE_BUCKET_EDGES)
+    return list(zip(edges, edges[1:] + [None]))
+
+
+def facet_counts(rows, category=None, featured=None, in_stock=None):
+    """Aggregate summary rows into the /products/facets payload.
+
+    Each facet honours every filter except its own, so the client can show
+    how many products switching that filter would give (e.g. the counts of
+    the other categories while one is selected). `total` honours them all.
+    """
+    def matches(row, skip=None):
+        return ((skip == 'category' or category is None or row.category == category)
+                and (skip == 'featured' or featured is None or bool(row.featured) == featured)
+                and (skip == 'in_stock' or in_stock is None or bool(row.in_stock) == in_stock))
+
+    categories, buckets = {}, [0] * len(PRICE_BUCKET_EDGES)
+    total = featured_count = in_stock_count = 0
+    for row in rows:
+        count = row.product_count
+        if matches(row, skip='category'):
+            categories[row.category] = categories.get(row.category, 0) + count
+        if matches(row, skip='featured') and row.featured:
+            featured_count += count
+        if matches(row, skip='in_stock') and row.in_stock:
+            in_stock_count += count
+        if matches(row):
+            total += count
+            buckets[row.price_bucket] += count
+
+    return {
+        'total': total,
+        'categories': [{'category': name, 'count': count}
+                       for name, count in sorted(categories.items()) if count],
+        'featured': featured_count,
+        'in_stock': in_stock_count,
+        'price_ranges': [{'min': low, 'max': high, 'count': count}
+                         for (low, high), count in zip(price_ranges(), buckets)],
+    }
@@ -0,0 +1,43 @@
+from flask import current_app, request
+
+from app.utils.cache import catalog_version
+
+
+def catalog_etag():
+    """Return the ETag for the current catalog version.
+
+    The ETag is the only validator. Last-Modified would have one-second
+    resolution, so two bumps within a second would give false 304s.
+    """
+    return f'c{catalog_version.get()}'
+
+
+def is_not_modified(etag):
+    """Check the request's If-None-Match against the catalog ETag."""
+    # Compressed representations carry a suffixed ETag, see compression.py.
+    return any(request.if_none_match.contains_weak(etag + suffix)
+               for suffix in ('', '-br', '-gz'))
+
+
+def not_modified_response(etag):
+    response = current_app.response_class(status=304)
+    return apply_cache_headers(response, etag)
+
+
+def apply_cache_headers(response, etag):
+    """Attach the ETag and cache directives to a catalog response.
+
+    Browsers revalidate on every use (a cheap 304 while the version is
+    unchanged), so an admin edit shows up on the next request. The CDN keeps
+    the response for CATALOG_S_MAXAGE and may serve it stale while it
+    refreshes; must-revalidate would forbid that, so those directives go in
+    CDN-Cache-Control, which CDNs prefer over Cache-Control.
+    """
+    response.set_etag(etag)
+    s_maxage = current_app.config.get('CATALOG_S_MAXAGE', 300)
+    response.headers['Cache-Control'] = f'public, max-age=0, must-revalidate, s-maxage={s_maxage}'
+    response.headers['CDN-Cache-Control'] = (
+        f"public, max-age={s_maxage}, "
+        f"stale-while-revalidate={current_app.config.get('CATALOG_CACHE_STALE_TTL', 30)}"
+    )
+    return response
@@ -0,0 +1,157 @@
+import os
+import threading
+
+from flask import current_app
+
+from app import db
+from app.models.product import Product
+from app.utils.cache import bump_catalog_version
+from app.utils.workers import BoundedExecutor
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+# Longest edge in pixels for each responsive variant.
+VARIANT_WIDTHS = {
+    'thumb': 160,
+    'card': 400,
+    'full': 1600,
+}
+
+image_executor = BoundedExecutor('image', 'IMAGE_WORKERS', 'IMAGE_QUEUE_SIZE')
+
+
+def cloudinary_variants(image_url):
+    """Build variants for a Cloudinary URL using on-the-fly transformations.
+
+    Returns None for any other URL.
+    """
+    marker = '/image/upload/'
+    if not image_url or marker not in image_url:
+        return None
+    head, tail = image_url.split(marker, 1)
+    variants = {}
+    for name, width in VARIANT_WIDTHS.items():
+        base = f'{head}{marker}c_limit,w_{width},q_auto'
+        variants[name] = {
+            'width': width,
+            'webp': f'{base},f_webp/{tail}',
+            'jpeg': f'{base},f_jpg/{tail}',
+        }
+    return variants
+
+
+def local_upload_path(image_url):
+    """Map a `/uploads/...` URL back to the file in UPLOAD_FOLDER."""
+    if not image_url or not image_url.startswith('/uploads/'):
+        return None
+    upload_folder = current_app.config.get('UPLOAD_FOLDER')
+    path = os.path.join(upload_folder, image_url[len('/uploads/'):])
+    return path if os.path.isfile(path) else None
+
+
+def _save_atomic(image, path, fmt, **options):
+    """Save via a temporary file so readers never see a partly written image."""
+    tmp_path = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    try:
+        image.save(tmp_path, fmt, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def generate_variants(src_path, upload_folder, webp_quality=80, jpeg_quality=82):
+    """Write resized WebP and JPEG copies of `src_path` without metadata.
+
+    The copies are written next to the original, so content-addressed uploads
+    keep their variants in the same shard. Variants that already exist (a
+    duplicate upload of the same content) are reused rather than rewritten.
+    Returns a map of variant name to its dimensions and `/uploads/` URLs.
+    """
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    out_dir = os.path.dirname(src_path)
+    rel_dir = os.path.relpath(out_dir, upload_folder)
+    url_prefix = '/uploads' if rel_dir == '.' else f"/uploads/{rel_dir.replace(os.sep, '/')}"
+
+    sizes = {}
+    for name in VARIANT_WIDTHS:
+        webp_path = os.path.join(out_dir, f'{stem}-{name}.webp')
+        jpeg_path = os.path.join(out_dir, f'{stem}-{name}.jpg')
+        if os.path.isfile(webp_path) and os.path.isfile(jpeg_path):
+            with Image.open(jpeg_path) as existing:
+                sizes[name] = existing.size
+
+    missing = [name for name in VARIANT_WIDTHS if name not in sizes]
+    if missing:
+        with Image.open(src_path) as original:
+            # Apply the EXIF orientation before the metadata is dropped.
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+            for name in missing:
+                width = VARIANT_WIDTHS[name]
+                resized = image.copy()
+                resized.thumbnail((width, width), Image.LANCZOS)
+                # Saving without exif=/icc_profile= strips the source metadata.
+                _save_atomic(resized, os.path.join(out_dir, f'{stem}-{name}.webp'), 'WEBP',
+                             quality=webp_quality, method=4)
+                _save_atomic(resized.convert('RGB'), os.path.join(out_dir, f'{stem}-{name}.jpg'), 'JPEG',
+                             quality=jpeg_quality, optimize=True, progressive=True)
+                sizes[name] = resized.size
+
+    variants = {}
+    for name in VARIANT_WIDTHS:
+        width, height = sizes[name]
+        variants[name] = {
+            'width': width,
+            'height': height,
+            'webp': f'{url_prefix}/{stem}-{name}.webp',
+            'jpeg': f'{url_prefix}/{stem}-{name}.jpg',
+        }
+    return variants
+
+
+def _process_product_image(app, product_id, image_url, src_path):
+    with app.app_context():
+        try:
+            variants = generate_variants(
+                src_path,
+                app.config['UPLOAD_FOLDER'],
+                webp_quality=app.config.get('IMAGE_WEBP_QUALITY', 80),
+                jpeg_quality=app.config.get('IMAGE_JPEG_QUALITY', 82),
+            )
+            product = db.session.get(Product, product_id)
+            # The image may have been replaced while this job was queued.
+            if product is None or product.image_url != image_url:
+                return
+            product.image_variants = variants
+            db.session.commit()
+            bump_catalog_version()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f'Image processing failed for product {product_id}: {e}')
+        finally:
+            db.session.remove()
+
+
+def schedule_variants(product):
+    """Queue generation of responsive variants for a committed product.
+
+    Only local uploads need processing; Cloudinary images use
+    `cloudinary_variants` instead. The pool is bounded: when it is saturated
+    the product keeps serving its original image rather than resizing on the
+    request thread; the variants are made the next time it is saved.
+    """
+    src_path = local_upload_path(product.image_url)
+    if src_path is None or not PIL_AVAILABLE:
+        return
+
+    app = current_app._get_current_object()
+    if image_executor.submit(app, _process_product_image, app, product.id, product.image_url, src_path) is None:
+        app.logger.warning(f'Image pool is full, skipped variants for product {product.id}')
@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from math import ceil
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.utils.db_routing import replica_router
+from app.utils.pagination import apply_keyset, finish_keyset
+
+
+@contextmanager
+def read_only_session(primary=False):
+    """A short-lived session for listings that never writes.
+
+    Autoflush is off and the transaction is always rolled back; on Postgres
+    it is also declared READ ONLY so the server can skip write bookkeeping.
+    Runs on the read replica when one is configured, unless `primary` is set.
+    """
+    engine = db.engine if primary else replica_router.read_engine()
+    session = Session(bind=engine, autoflush=False, expire_on_commit=False)
+    try:
+        if engine.dialect.name == 'postgresql':
+            session.execute(db.text('SET TRANSACTION READ ONLY'))
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+class Listing:
+    """Column-only read path for list endpoints.
+
+    Selects just the columns the encoder needs (plus any sort keys) and
+    returns plain rows instead of ORM instances, so there is no identity map
+    or attribute instrumentation to pay for. Rows expose columns as
+    attributes, so the compiled model encoders accept them unchanged.
+    """
+
+    def __init__(self, model, encoder, where=(), fields=None, refine=None):
+        self.model = model
+        self.encoder = encoder
+        self.where = list(where)
+        self.fields = fields
+        # Optional callable applied to the row select, e.g. to join a search index.
+        self.refine = refine
+
+    def _select(self, extra=()):
+        names = list(self.fields or self.encoder.fields)
+        names += [c.key for c in extra if c.key not in names]
+        stmt = select(*[getattr(self.model, name) for name in names]).where(*self.where)
+        return self.refine(stmt) if self.refine else stmt
+
+    def count(self, session):
+        stmt = select(func.count()).select_from(self.model).where(*self.where)
+        return session.execute(stmt).scalar()
+
+    def page(self, page, per_page, order_by):
+        """Offset pagination with the same semantics as Flask-SQLAlchemy's
+        paginate(error_out=False). Returns (items, total, pages)."""
+        page = page if page >= 1 else 1
+        per_page = per_page if per_page >= 1 else 20
+        with read_only_session() as session:
+            total = self.count(session)
+            stmt = self._select().order_by(*order_by).limit(per_page).offset((page - 1) * per_page)
+            rows = session.execute(stmt).all()
+        pages = ceil(total / per_page) if total else 0
+        return self.encoder.encode_many(rows, self.fields), total, pages
+
+    def keyset(self, columns, cursor=None, limit=20, descending=False, include_total=False):
+        """Keyset pagination over `columns`. Returns (items, next_cursor, total)."""
+        with read_only_session() as session:
+            total = self.count(session) if include_total else None
+            stmt, limit = apply_keyset(self._select(extra=columns), columns, cursor, limit, descending)
+            rows, next_cursor = finish_keyset(session.execute(stmt).all(), columns, limit)
+        return self.encoder.encode_many(rows, self.fields), next_cursor, total
+
+    def all(self, order_by=(), limit=None):
+        with read_only_session() as session:
+            stmt = self._select().order_by(*order_by)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            rows = session.execute(stmt).all()
+        return self.encoder.encode_many(rows, self.fields)
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+from app.utils.workers import pid_alive
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+# name -> (help, buckets); every metric here is a histogram.
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Request latency by endpoint.', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('Response body size by endpoint.', SIZE_BUCKETS),
+    'db_statements_per_request': ('SQL statements executed per request.', COUNT_BUCKETS),
+    'db_statement_seconds_per_request': ('Time spent in SQL per request.', LATENCY_BUCKETS),
+    'db_pool_checkout_wait_seconds': ('Time spent waiting for a pooled connection.', WAIT_BUCKETS),
+}
+GAUGES = {
+    'db_pool_checked_out': 'Connections currently checked out of the pool.',
+}
+
+
+class Metrics:
+    """Request, SQL and pool instrumentation exported at /metrics.
+
+    Nothing is registered unless METRICS_ENABLED is set, so a disabled
+    instance costs nothing per request. Each process keeps its own series
+    and, when METRICS_DIR is set, writes them to `<dir>/<pid>-<start>.json`
+    at most every METRICS_FLUSH_INTERVAL seconds; /metrics sums every file,
+    so any gunicorn worker can answer a scrape. Files of exited workers are
+    kept so counters never go backwards; clear the directory on deploy.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 1.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._series = {}
+        self._path = None
+        self._last_flush = 0.0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        if not self.enabled:
+            return
+        self.directory = app.config.get('METRICS_DIR')
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 1.0)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+        with app.app_context():
+            for key, engine in db.engines.items():
+                self._instrument_engine(engine, key or 'default')
+
+    # Recording
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = HISTOGRAMS[name][1]
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            series[0][bisect_left(buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _start_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_sql = [0, 0.0]
+
+    def _finish_request(self, response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        self.observe('http_request_duration_seconds', time.perf_counter() - start,
+                     endpoint=endpoint, method=request.method, status=str(response.status_code))
+        if not (response.is_streamed or response.direct_passthrough):
+            self.observe('http_response_size_bytes', response.calculate_content_length() or 0,
+                         endpoint=endpoint)
+        statements, seconds = g.pop('_metrics_sql', (0, 0.0))
+        self.observe('db_statements_per_request', statements, endpoint=endpoint)
+        self.observe('db_statement_seconds_per_request', seconds, endpoint=endpoint)
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return response
+
+    def _instrument_engine(self, engine, bind):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('_metrics_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['_metrics_start'].pop()
+            if has_request_context() and '_metrics_sql' in g:
+                g._metrics_sql[0] += 1
+                g._metrics_sql[1] += elapsed
+
+        # Pool events fire only after a connection is handed out, so time the
+        # checkout itself. Patching the engine (not the pool) survives dispose().
+        raw_connection = engine.raw_connection
+
+        def timed_raw_connection():
+            start = time.perf_counter()
+            try:
+                return raw_connection()
+            finally:
+                self.observe('db_pool_checkout_wait_seconds', time.perf_counter() - start, bind=bind)
+
+        engine.raw_connection = timed_raw_connection
+
+    # Export
+
+    def _snapshot(self):
+        with self._lock:
+            histograms = [[name, list(labels), buckets[:], total, count]
+                          for (name, labels), (buckets, total, count) in self._series.items()]
+        gauges = []
+        for key, engine in db.engines.items():
+            checkedout = getattr(engine.pool, 'checkedout', None)
+            if checkedout is not None:
+                gauges.append(['db_pool_checked_out', [['bind', key or 'default']], checkedout()])
+        return {'histograms': histograms, 'gauges': gauges}
+
+    def flush(self):
+        """Write this process's series to METRICS_DIR."""
+        with self._flush_lock:
+            if self._path is None:
+                self._path = os.path.join(self.directory, f'{os.getpid()}-{time.time_ns()}.json')
+            snapshot = self._snapshot()
+            snapshot['pid'] = os.getpid()
+            tmp_path = f'{self._path}.tmp'
+            with open(tmp_path, 'w') as fh:
+                json.dump(snapshot, fh, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+            self._last_flush = time.monotonic()
+
+    def _collect(self):
+        if not self.directory:
+            return [self._snapshot()]
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as fh:
+                    snapshot = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            # Gauges describe live state; drop those of exited workers.
+            if not pid_alive(snapshot.get('pid')):
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        """Merge all snapshots into the Prometheus text exposition format."""
+        histograms, gauges = {}, {}
+        for snapshot in self._collect():
+            for name, labels, buckets, total, count in snapshot['histograms']:
+                if name not in HISTOGRAMS:
+                    continue
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+            for name, labels, value in snapshot['gauges']:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+
+        lines = []
+        for name, (help_text, bounds) in HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for (series_name, labels), (buckets, total, count) in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, hits in zip(list(bounds) + ['+Inf'], buckets):
+                    cumulative += hits
+                    lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {total}')
+                lines.append(f'{name}_count{_labels(labels)} {count}')
+        for name, help_text in GAUGES.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for (series_name, labels), value in sorted(gauges.items()):
+                if series_name == name:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        return current_app.response_class(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+metrics = Metrics()
@@ -0,0 +1,89 @@
+import base64
+import json
+import numbers
+
+from sqlalchemy import and_, or_
+
+MAX_CURSOR_LIMIT = 100
+
+
+def encode_cursor(values):
+    """Pack the sort-key values of the last row into an opaque cursor string."""
+    raw = json.dumps(
+        [v.isoformat() if hasattr(v, 'isoformat') else v for v in values],
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Unpack a cursor produced by `encode_cursor` for the given sort columns.
+
+    Raises ValueError if the cursor is malformed, including a well-formed
+    one whose values do not fit the columns.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+
+    decoded = []
+    try:
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if hasattr(python_type, 'fromisoformat'):
+                if not isinstance(value, str):
+                    raise TypeError(value)
+                value = python_type.fromisoformat(value)
+            elif isinstance(value, bool) or not isinstance(value, _json_types(python_type)):
+                raise TypeError(value)
+            decoded.append(value)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    return decoded
+
+
+def _json_types(python_type):
+    """The JSON value types a cursor may hold for a column of `python_type`."""
+    if python_type is int:
+        return int
+    if issubclass(python_type, numbers.Number):
+        return (int, float)
+    return python_type
+
+
+def _after(columns, values, descending):
+    """Build `(c1, c2, ...) > (v1, v2, ...)` (or `<`) without row-value syntax."""
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        step = column < value if descending else column > value
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def apply_keyset(stmt, columns, cursor=None, limit=20, descending=False):
+    """Seek `stmt` (a Query or select()) past `cursor` and order it by `columns`.
+
+    Fetches one extra row so `finish_keyset` can tell whether a next page
+    exists. Returns the statement and the clamped limit.
+    """
+    limit = max(1, min(limit, MAX_CURSOR_LIMIT))
+    if cursor:
+        stmt = stmt.where(_after(columns, decode_cursor(cursor, columns), descending))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return stmt.order_by(*order).limit(limit + 1), limit
+
+
+def finish_keyset(rows, columns, limit):
+    """Trim the look-ahead row and build the cursor for the next page."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
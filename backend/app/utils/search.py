@@ -0,0 +1,88 @@
+import re
+
+from sqlalchemy import func, literal_column, or_, table, column
+
+from app.models.product import Product
+from app.utils.ddl import create_after
+
+# SQLite: an external-content FTS5 table over products(name, description),
+# kept in sync by triggers so every write path (ORM or bulk) updates it.
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+
+# Postgres: a generated tsvector column (always in sync) with a GIN index.
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+POSTGRES_SEARCH_DROP = [
+    "DROP INDEX IF EXISTS ix_products_search_vector",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_vector",
+]
+
+create_after(Product.__table__, SQLITE_SEARCH_DDL, POSTGRES_SEARCH_DDL)
+
+products_fts = table('products_fts', column('rowid'))
+
+MAX_SEARCH_TERMS = 8
+
+
+def search_terms(q):
+    """Split user input into plain word tokens safe for MATCH / to_tsquery."""
+    return re.findall(r'\w+', q.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_products(query, q, dialect_name):
+    """Restrict a Product query to rows matching `q`, best matches first.
+
+    Every term must match; the last one is treated as a prefix so results
+    update while the customer is still typing.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query.filter(False)
+
+    if dialect_name == 'sqlite':
+        match = ' '.join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+        rank = func.bm25(literal_column('products_fts'), 10.0, 1.0)
+        return (query.join(products_fts, products_fts.c.rowid == Product.id)
+                .filter(literal_column('products_fts').op('MATCH')(match.strip()))
+                .order_by(rank, Product.id))
+
+    if dialect_name == 'postgresql':
+        tsquery = func.to_tsquery('english', ' & '.join(terms[:-1] + [f'{terms[-1]}:*']))
+        vector = literal_column('products.search_vector')
+        return (query.filter(vector.op('@@')(tsquery))
+                .order_by(func.ts_rank_cd(vector, tsquery).desc(), Product.id))
+
+    # Other backends: unindexed substring match, kept only for completeness.
+    for term in terms:
+        pattern = f'%{term}%'
+        query = query.filter(or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
+    return query.order_by(Product.id)
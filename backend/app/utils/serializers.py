@@ -0,0 +1,155 @@
+import re
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+# Field name -> conversion; these define the Model.to_dict() output. 'iso'
+# formats a nullable datetime, 'dict' replaces None with {}, None copies.
+PRODUCT_FIELDS = {
+    'id': None,
+    'name': None,
+    'description': None,
+    'price': None,
+    'category': None,
+    'image_url': None,
+    'image_variants': 'dict',
+    'in_stock': None,
+    'featured': None,
+    'created_at': 'iso',
+    'updated_at': 'iso',
+}
+
+CONTACT_MESSAGE_FIELDS = {
+    'id': None,
+    'name': None,
+    'email': None,
+    'phone': None,
+    'subject': None,
+    'message': None,
+    'status': None,
+    'receipt_id': None,
+    'created_at': 'iso',
+}
+
+UPLOAD_JOB_FIELDS = {
+    'id': None,
+    'product_id': None,
+    'source_url': None,
+    'remote_url': None,
+    'status': None,
+    'attempts': None,
+    'error': None,
+    'created_at': 'iso',
+    'updated_at': 'iso',
+}
+
+_CONVERSIONS = {
+    None: 'o.{0}',
+    'iso': '(o.{0}.isoformat() if o.{0} is not None else None)',
+    'dict': '(o.{0} or {{}})',
+}
+
+
+class ModelEncoder:
+    """Turns model instances (or row tuples with the same attributes) into
+    dicts using a function generated once per field selection.
+
+    The generated function is a single dict literal, which avoids the
+    per-field method calls and branches of to_dict() on large listings.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._compiled = {}
+
+    def parse_fields(self, value):
+        """Parse a `?fields=a,b` value; None selects every field.
+
+        Raises ValueError for unknown field names.
+        """
+        if not value:
+            return None
+        selected = tuple(f.strip() for f in value.split(',') if f.strip())
+        unknown = [f for f in selected if f not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return selected
+
+    def compile(self, fields=None):
+        fields = tuple(fields) if fields else tuple(self.fields)
+        encode = self._compiled.get(fields)
+        if encode is None:
+            items = ', '.join(f"'{f}': {_CONVERSIONS[self.fields[f]].format(f)}" for f in fields)
+            namespace = {}
+            exec(f'def encode(o):\n    return {{{items}}}\n', namespace)
+            encode = self._compiled[fields] = namespace['encode']
+        return encode
+
+    def encode(self, obj, fields=None):
+        return self.compile(fields)(obj)
+
+    def encode_many(self, objs, fields=None):
+        encode = self.compile(fields)
+        return [encode(o) for o in objs]
+
+
+product_encoder = ModelEncoder(PRODUCT_FIELDS)
+contact_message_encoder = ModelEncoder(CONTACT_MESSAGE_FIELDS)
+upload_job_encoder = ModelEncoder(UPLOAD_JOB_FIELDS)
+
+
+# orjson writes floats from 1e16 up, and below 1e-4, unlike json.dumps
+# (1e16 vs 1e+16, 1e-9 vs 1e-09, 0.00001 vs 1e-05). A body that may hold
+# one is re-encoded; a match inside a string only costs the fast path.
+# Leading with the literal `e` keeps the scan fast on long text.
+_ORJSON_EXPONENT_RE = re.compile(rb'e(?<=\de)(?:\d|-\d(?!\d))')
+_ORJSON_SMALL_FLOAT = b'0.0000'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes compact bodies with orjson when installed.
+
+    Output is byte-for-byte what the default provider writes. Bodies orjson
+    would write differently (non-ASCII text, some float notations, non-string
+    keys, ints beyond 64 bits) are encoded with the stdlib instead, as is
+    pretty-printed output.
+    """
+
+    def _compact_dumps(self, obj):
+        """`json.dumps(obj, separators=(',', ':'))` as bytes via orjson, or None."""
+        if not ORJSON_AVAILABLE:
+            return None
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            body = orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return None
+        if self.ensure_ascii and (not body.isascii() or b'\x7f' in body):
+            # The stdlib's C escaper beats escaping orjson's UTF-8 in Python.
+            return None
+        if _ORJSON_SMALL_FLOAT in body or _ORJSON_EXPONENT_RE.search(body):
+            return None
+        return body
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == {'separators': (',', ':')}:
+            body = self._compact_dumps(obj)
+            if body is not None:
+                return body.decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._compact_dumps(obj)
+        if body is None:
+            body = super().dumps(obj, separators=(',', ':')).encode()
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
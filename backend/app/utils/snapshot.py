@@ -0,0 +1,316 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from math import ceil
+
+from sqlalchemy import select
+
+from app.models.product import Product
+from app.utils.cache import catalog_version, on_catalog_bump
+from app.utils.listing import read_only_session
+from app.utils.pagination import MAX_CURSOR_LIMIT, decode_cursor, encode_cursor
+from app.utils.serializers import product_encoder
+from app.utils.workers import WorkerThread
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process rebuild lock
+    fcntl = None
+
+MAGIC = b'UPSNAP1\0'
+# magic, generation, product count, records, directory (offset, length), categories (offset, length)
+HEADER = struct.Struct('<8sQQQQQQQ')
+# product id, body offset, body length; records are sorted by id
+RECORD = struct.Struct('<QQI')
+# Stands in for the product list when rendering the envelope around it.
+_PLACEHOLDER = '\x00snapshot-items\x00'
+# Separators of JSON responses, so snapshot bodies match the database path.
+COMPACT = (',', ':')
+
+
+def list_key(category=None, featured=False):
+    """Directory key of the member list for a category/featured filter."""
+    if category:
+        return f'cf:{category}' if featured else f'c:{category}'
+    return 'featured' if featured else 'all'
+
+
+class SnapshotView:
+    """Read-only view over one mapped snapshot file.
+
+    Product bodies are returned as memoryview slices of the mapping, so all
+    workers serve them from the same page-cache pages.
+    """
+
+    def __init__(self, mapping, inode):
+        self.mapping = mapping
+        self.inode = inode
+        self.buffer = memoryview(mapping)
+        (magic, self.generation, self.count, self.records_offset,
+         directory_offset, directory_length,
+         categories_offset, categories_length) = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a catalog snapshot')
+        self.directory = json.loads(bytes(self.buffer[directory_offset:directory_offset + directory_length]))
+        self.categories_body = self.buffer[categories_offset:categories_offset + categories_length]
+
+    def record(self, index):
+        return RECORD.unpack_from(self.mapping, self.records_offset + index * RECORD.size)
+
+    def body(self, index):
+        _, offset, length = self.record(index)
+        return self.buffer[offset:offset + length]
+
+    def members(self, key):
+        """Record indexes (in id order) matching a filter; empty if unknown."""
+        entry = self.directory.get(key)
+        if entry is None:
+            return memoryview(b'').cast('I')
+        offset, count = entry
+        return self.buffer[offset:offset + count * 4].cast('I')
+
+    def _first_after(self, members, product_id):
+        """Position of the first member whose product id is > product_id."""
+        lo, hi = 0, len(members)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record(members[mid])[0] <= product_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, product_id):
+        index = self._first_after(range(self.count), product_id - 1)
+        if index < self.count and self.record(index)[0] == product_id:
+            return self.body(index)
+        return None
+
+
+class CatalogSnapshot:
+    """Pre-serialized catalog shared by every worker through a mapped file.
+
+    After each catalog version bump one worker rewrites the snapshot (every
+    product's JSON, an id index and per-category/featured member lists) to a
+    temporary file and renames it over CATALOG_SNAPSHOT_FILE. Workers notice
+    the new inode and remap it. A snapshot is only served while its
+    generation equals the current catalog version, so a stale or missing
+    snapshot simply falls back to the database path.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.path = None
+        self._view = None
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._builder = WorkerThread(self._run, 'catalog-snapshot')
+
+    def init_app(self, app):
+        self.app = app
+        self.path = app.config.get('CATALOG_SNAPSHOT_FILE') if app.config.get('CATALOG_SNAPSHOT_ENABLED') else None
+        self._view = None
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            on_catalog_bump(self._on_bump)
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    # Reading
+
+    def current(self):
+        """The mapped snapshot if it matches the catalog version, else None.
+
+        A stale snapshot schedules a rebuild so the next requests can use it.
+        """
+        if not self.enabled or self.app.debug:
+            return None
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            inode = None
+        view = self._view
+        if inode is not None and (view is None or view.inode != inode):
+            view = self._map(inode)
+        if view is None or view.generation != catalog_version.get():
+            self.schedule_rebuild()
+            return None
+        return view
+
+    def _map(self, inode):
+        with self._lock:
+            if self._view is not None and self._view.inode == inode:
+                return self._view
+            try:
+                with open(self.path, 'rb') as fh:
+                    mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = SnapshotView(mapping, inode)
+            except (OSError, ValueError) as e:
+                self.app.logger.warning(f'Could not map catalog snapshot: {e}')
+            # The previous mapping is released once no response uses it.
+            return self._view
+
+    # Rendering; each returns the response body or None to fall back.
+
+    def _envelope(self, payload, items):
+        head, tail = self.app.json.dumps(payload, separators=COMPACT).split(json.dumps(_PLACEHOLDER))
+        return b''.join([head.encode(), b'[', b','.join(items), b']', tail.encode(), b'\n'])
+
+    def products_page(self, view, page, per_page, category, featured):
+        """Offset pagination, same semantics as Listing.page()."""
+        members = view.members(list_key(category, featured))
+        current_page = page
+        page = page if page >= 1 else 1
+        per_page = per_page if per_page >= 1 else 20
+        start = (page - 1) * per_page
+        items = [view.body(i) for i in members[start:start + per_page]]
+        total = len(members)
+        return self._envelope({
+            'products': _PLACEHOLDER,
+            'total': total,
+            'pages': ceil(total / per_page) if total else 0,
+            'current_page': current_page,
+        }, items)
+
+    def products_keyset(self, view, cursor, limit, include_total, category, featured):
+        """Keyset pagination over id, same semantics as Listing.keyset()."""
+        members = view.members(list_key(category, featured))
+        limit = max(1, min(limit, MAX_CURSOR_LIMIT))
+        start = view._first_after(members, decode_cursor(cursor, [Product.id])[0]) if cursor else 0
+        selected = members[start:start + limit]
+        next_cursor = None
+        if start + limit < len(members):
+            next_cursor = encode_cursor([view.record(selected[-1])[0]])
+        payload = {'products': _PLACEHOLDER, 'next_cursor': next_cursor}
+        if include_total:
+            payload['total'] = len(members)
+        return self._envelope(payload, [view.body(i) for i in selected])
+
+    def products_by_id(self, view, ids):
+        """Batch lookup; `ids` are unique, results keep their order."""
+        items, missing = [], []
+        for product_id in ids:
+            body = view.find(product_id)
+            if body is None:
+                missing.append(product_id)
+            else:
+                items.append(body)
+        return self._envelope({'products': _PLACEHOLDER, 'missing': missing}, items)
+
+    def product(self, view, product_id):
+        body = view.find(product_id)
+        return None if body is None else b''.join([body, b'\n'])
+
+    def categories(self, view):
+        return b''.join([view.categories_body, b'\n'])
+
+    # Building
+
+    def _on_bump(self, version):
+        self.schedule_rebuild()
+
+    def schedule_rebuild(self):
+        if self.app.config.get('BACKGROUND_JOBS_SYNC'):
+            self.rebuild()
+            return
+        self._pending.set()
+        self._builder.ensure_started()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            # Bumps that arrive while building are coalesced into one rebuild.
+            self._pending.clear()
+            try:
+                self.rebuild()
+            except Exception as e:
+                self.app.logger.error(f'Catalog snapshot rebuild failed: {e}')
+
+    def rebuild(self):
+        """Write a snapshot of the current catalog unless one is already current."""
+        lock_file = open(f'{self.path}.lock', 'a')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False  # another worker is building it
+            with self.app.app_context():
+                # Read the version first: a snapshot may be newer than its
+                # generation claims, never older.
+                generation = catalog_version.get()
+                existing = self._read_generation()
+                if existing == generation:
+                    return False
+                self._write(generation)
+            return True
+        finally:
+            lock_file.close()
+
+    def _read_generation(self):
+        try:
+            with open(self.path, 'rb') as fh:
+                magic, generation = HEADER.unpack(fh.read(HEADER.size))[:2]
+            return generation if magic == MAGIC else None
+        except (OSError, struct.error):
+            return None
+
+    def _write(self, generation):
+        dumps = self.app.json.dumps
+        encode = product_encoder.compile()
+        records = bytearray()
+        lists = {}
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fh:
+            fh.write(b'\0' * HEADER.size)
+            offset = HEADER.size
+            stmt = select(Product).order_by(Product.id).execution_options(yield_per=1000)
+            with read_only_session(primary=True) as session:
+                for index, product in enumerate(session.execute(stmt).scalars()):
+                    body = dumps(encode(product), separators=COMPACT).encode()
+                    fh.write(body)
+                    records += RECORD.pack(product.id, offset, len(body))
+                    offset += len(body)
+                    keys = [list_key(), list_key(product.category)]
+                    if product.featured:
+                        keys += [list_key(featured=True), list_key(product.category, True)]
+                    for key in keys:
+                        lists.setdefault(key, array('I')).append(index)
+                    session.expunge(product)
+            count = len(records) // RECORD.size
+
+            records_offset = offset
+            fh.write(records)
+            offset += len(records)
+
+            directory = {}
+            for key, members in lists.items():
+                data = members.tobytes()
+                fh.write(data)
+                directory[key] = [offset, len(members)]
+                offset += len(data)
+
+            directory_body = json.dumps(directory, separators=(',', ':')).encode()
+            directory_offset = offset
+            fh.write(directory_body)
+            offset += len(directory_body)
+
+            categories = sorted(key[2:] for key in lists if key.startswith('c:'))
+            categories_body = dumps(categories, separators=COMPACT).encode()
+            fh.write(categories_body)
+
+            fh.seek(0)
+            fh.write(HEADER.pack(MAGIC, generation, count, records_offset,
+                                 directory_offset, len(directory_body),
+                                 offset, len(categories_body)))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,89 @@
+import time
+
+from sqlalchemy import event
+
+from app import db
+from app.utils.workers import WorkerThread
+
+# Bound the WAL file after checkpoints so a burst of writes doesn't leave it large.
+JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+
+def profile_pragmas(config):
+    """The pragmas applied to every new SQLite connection, in order."""
+    return [
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE', -65536)),
+        ('temp_store', 'MEMORY'),
+        ('journal_size_limit', JOURNAL_SIZE_LIMIT),
+    ]
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def is_file_database(engine):
+    return engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:')
+
+
+class SQLiteProfile:
+    """Production settings for file-backed SQLite under several workers.
+
+    WAL lets readers proceed while a writer holds the lock, and busy_timeout
+    makes writers queue instead of failing with "database is locked". Each
+    worker also checkpoints the WAL and runs PRAGMA optimize periodically
+    from a daemon thread, started on the worker's first connection.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.engines = []
+        self._maintenance = WorkerThread(self._run, 'sqlite-maintenance')
+
+    def init_app(self, app):
+        self.app = app
+        if not app.config.get('SQLITE_PRODUCTION_PROFILE', True):
+            return
+        pragmas = profile_pragmas(app.config)
+        with app.app_context():
+            self.engines = [e for e in db.engines.values() if is_file_database(e)]
+        for engine in self.engines:
+            @event.listens_for(engine, 'connect')
+            def on_connect(dbapi_connection, connection_record):
+                apply_pragmas(dbapi_connection, pragmas)
+                self._maintenance.ensure_started()
+
+    def _run(self):
+        checkpoint_interval = self.app.config.get('SQLITE_CHECKPOINT_INTERVAL', 60)
+        optimize_interval = self.app.config.get('SQLITE_OPTIMIZE_INTERVAL', 3600)
+        last_optimize = time.monotonic()
+        while True:
+            time.sleep(checkpoint_interval)
+            optimize = time.monotonic() - last_optimize >= optimize_interval
+            for engine in self.engines:
+                try:
+                    self.maintain(engine, optimize)
+                except Exception as e:
+                    self.app.logger.warning(f'SQLite maintenance failed: {e}')
+            if optimize:
+                last_optimize = time.monotonic()
+
+    def maintain(self, engine, optimize=False):
+        """Checkpoint the WAL without blocking anyone, optionally refreshing
+        planner statistics with PRAGMA optimize."""
+        with engine.connect() as conn:
+            conn.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)')
+            if optimize:
+                conn.exec_driver_sql('PRAGMA optimize')
+
+
+sqlite_profile = SQLiteProfile()
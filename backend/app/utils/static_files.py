@@ -0,0 +1,102 @@
+import mimetypes
+import os
+import re
+
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+from app.utils.images import VARIANT_WIDTHS
+
+# Content-addressed uploads and their variants, see storage.save_content_addressed.
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{64}(?:-\w+)?\.\w+(?:\.br|\.gz)?$')
+
+# Precompressed siblings tried in order of preference.
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _variant_path(path, variant):
+    """Return the on-disk variant of `path` the client can use, if any."""
+    stem = os.path.splitext(path)[0]
+    candidates = [f'{stem}-{variant}.jpg']
+    if 'image/webp' in request.headers.get('Accept', ''):
+        candidates.insert(0, f'{stem}-{variant}.webp')
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _precompressed_path(path):
+    """Pick a precompressed sibling of `path`.
+
+    Returns (path, content_encoding, has_siblings).
+    """
+    accepted = request.accept_encodings
+    siblings = [(encoding, path + suffix) for encoding, suffix in PRECOMPRESSED
+                if os.path.isfile(path + suffix)]
+    for encoding, sibling in siblings:
+        if accepted[encoding]:
+            return sibling, encoding, True
+    return path, None, bool(siblings)
+
+
+def serve_upload(filename):
+    """Serve a file from UPLOAD_FOLDER.
+
+    Content-addressed names never change content, so they get a far-future
+    immutable Cache-Control and a strong ETag derived from the hash. Other
+    names get a short max-age. `?variant=card` serves a pre-resized copy
+    (WebP when accepted) and `.br` / `.gz` siblings are served to clients that
+    accept them. When UPLOADS_SENDFILE_HEADER is set the bytes are left to the
+    front proxy (X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd);
+    otherwise werkzeug answers Range and conditional requests itself.
+    """
+    upload_folder = current_app.config.get('UPLOAD_FOLDER')
+    path = safe_join(upload_folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    variant = request.args.get('variant')
+    if variant not in VARIANT_WIDTHS:
+        # Only known names ever reach the filesystem; anything else gets the original.
+        variant = None
+    if variant:
+        path = _variant_path(path, variant) or path
+
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    path, encoding, has_precompressed = _precompressed_path(path)
+
+    if HASHED_NAME_RE.match(os.path.basename(path)):
+        etag = os.path.basename(path)
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        stat = os.stat(path)
+        etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        cache_control = f"public, max-age={current_app.config.get('UPLOADS_MAX_AGE', 3600)}"
+
+    sendfile_header = current_app.config.get('UPLOADS_SENDFILE_HEADER')
+    if sendfile_header:
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(mimetype=mimetype)
+            if sendfile_header == 'X-Accel-Redirect':
+                rel_path = os.path.relpath(path, upload_folder).replace(os.sep, '/')
+                prefix = current_app.config.get('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+                response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + rel_path
+            else:
+                response.headers[sendfile_header] = path
+        response.set_etag(etag)
+    else:
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = cache_control
+    if variant:
+        response.vary.add('Accept')
+    if has_precompressed:
+        response.vary.add('Accept-Encoding')
+    return response
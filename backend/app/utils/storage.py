@@ -1,7 +1,11 @@
+import hashlib
 import os
+import tempfile
 from werkzeug.utils import secure_filename
 from flask import current_app
 
+from app.utils.tracing import span
+
 try:
     import cloudinary
     import cloudinary.uploader
@@ -9,26 +13,101 @@ try:
 except Exception:
     CLOUDINARY_AVAILABLE = False
 
+CHUNK_SIZE = 64 * 1024
 
-def upload_file(file_storage):
-    """Upload a FileStorage object.
 
-    If Cloudinary is configured (`CLOUDINARY_URL` env var), upload there and
-    return the public URL. Otherwise save to `UPLOAD_FOLDER` and return a
-    relative `/uploads/<filename>` path.
+def save_content_addressed(file_storage, upload_folder):
+    """Store an upload under its SHA-256 and return the path relative to
+    `upload_folder`, e.g. `ab/cd/abcd...ef.jpg`.
+
+    The upload is streamed to a temp file while it is hashed and then renamed
+    into place, so readers never see a partial file. Identical content maps
+    to the same path and is only stored once.
     """
-    cloudinary_url = os.getenv('CLOUDINARY_URL')
-    if CLOUDINARY_AVAILABLE and cloudinary_url:
+    _, ext = os.path.splitext(secure_filename(file_storage.filename or ''))
+    ext = ext.lower()
+
+    tmp_dir = os.path.join(upload_folder, '.tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = digest.hexdigest()
+        rel_path = os.path.join(name[:2], name[2:4], f'{name}{ext}')
+        dest_path = os.path.join(upload_folder, rel_path)
+        if os.path.exists(dest_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, dest_path)
+        return rel_path.replace(os.sep, '/')
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CloudinaryUploader:
+    """Uploads local files to Cloudinary. Configured once, not per upload."""
+
+    def __init__(self, cloudinary_url):
         cloudinary.config(cloudinary_url=cloudinary_url)
-        resp = cloudinary.uploader.upload(file_storage)
+
+    def upload(self, path):
+        resp = cloudinary.uploader.upload(path)
         return resp.get('secure_url')
 
-    # Fallback: save locally in UPLOAD_FOLDER
+
+class FakeUploader:
+    """Stand-in remote uploader for tests and local development."""
+
+    def __init__(self, base_url='https://uploads.example.test', fail_times=0):
+        self.base_url = base_url
+        self.fail_times = fail_times
+        self.uploaded = []
+
+    def upload(self, path):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError('simulated upload failure')
+        self.uploaded.append(path)
+        return f"{self.base_url}/{os.path.basename(path)}"
+
+
+def create_remote_uploader(app):
+    """Build the uploader selected by `REMOTE_UPLOADER`, or None for local only."""
+    backend = app.config.get('REMOTE_UPLOADER')
+    if backend == 'cloudinary':
+        cloudinary_url = app.config.get('CLOUDINARY_URL')
+        if not (CLOUDINARY_AVAILABLE and cloudinary_url):
+            app.logger.warning('REMOTE_UPLOADER=cloudinary but Cloudinary is not available')
+            return None
+        return CloudinaryUploader(cloudinary_url)
+    if backend == 'fake':
+        return FakeUploader()
+    return None
+
+
+def upload_file(file_storage):
+    """Store a FileStorage object locally.
+
+    The file is stored content-addressed in `UPLOAD_FOLDER` and a relative
+    `/uploads/ab/cd/<sha256>.<ext>` path is returned. When a remote uploader
+    is configured the caller queues the copy to it, see
+    `app.utils.upload_queue`.
+    """
     upload_folder = current_app.config.get('UPLOAD_FOLDER')
     if not upload_folder:
         raise RuntimeError('UPLOAD_FOLDER is not configured')
     os.makedirs(upload_folder, exist_ok=True)
-    filename = secure_filename(file_storage.filename)
-    dest_path = os.path.join(upload_folder, filename)
-    file_storage.save(dest_path)
-    return f"/uploads/{filename}"
+    with span('upload'):
+        return f"/uploads/{save_content_addressed(file_storage, upload_folder)}"
@@ -0,0 +1,210 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+from app.utils.auth import is_admin_request
+
+SLOW_LOGGER = 'uptown_stitch.slow'
+# Statements are logged truncated; parameters are never logged.
+MAX_STATEMENT_LENGTH = 2000
+
+
+def _current_trace():
+    if has_request_context():
+        return g.get('_trace')
+    return None
+
+
+@contextmanager
+def span(name, **extra):
+    """Time a block as a span of the current request's trace, if it is sampled."""
+    trace = _current_trace()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter(), **extra)
+
+
+class Trace:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.spans = []
+        self.slow_statements = []
+
+    def add(self, name, start, end, **extra):
+        record = {'name': name, 'offset_ms': round((start - self.start) * 1000, 3),
+                  'duration_ms': round((end - start) * 1000, 3)}
+        record.update(extra)
+        self.spans.append(record)
+        return record
+
+
+class Tracer:
+    """Sampled per-request tracing with a slow-request/slow-query log.
+
+    A sampled request records spans for every before/after-request hook,
+    the view, each SQL statement, uploads and JSON serialization. If the
+    request or any statement exceeds its threshold the trace is written to
+    a rotating log, with an EXPLAIN of each slow SELECT. Admins can also add
+    `?_profile=1` to any request to get a cProfile summary instead of the body.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_request = 0.5
+        self.slow_query = 0.1
+        self.logger = logging.getLogger(SLOW_LOGGER)
+
+    def init_app(self, app):
+        """Call last in create_app: wraps the hooks and views registered so far."""
+        self.enabled = app.config.get('TRACING_ENABLED', False)
+        if app.config.get('PROFILE_REQUESTS', True):
+            # Outermost on the way in, first on the way out so the CORS and
+            # compression hooks still apply to the summary.
+            app.before_request_funcs.setdefault(None, []).insert(0, self._start_profile)
+            app.after_request(self._finish_profile)
+        if not self.enabled:
+            return
+
+        self.sample_rate = app.config.get('TRACE_SAMPLE_RATE', 1.0)
+        self.slow_request = app.config.get('TRACE_SLOW_REQUEST_MS', 500) / 1000
+        self.slow_query = app.config.get('TRACE_SLOW_QUERY_MS', 100) / 1000
+        log_file = app.config.get('TRACE_LOG_FILE')
+        if log_file and not self.logger.handlers:
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            handler = RotatingFileHandler(
+                log_file,
+                maxBytes=app.config.get('TRACE_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                backupCount=app.config.get('TRACE_LOG_BACKUPS', 5),
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+
+        for funcs in app.before_request_funcs.values():
+            funcs[:] = [self._wrap(f, 'before_request') for f in funcs]
+        for funcs in app.after_request_funcs.values():
+            funcs[:] = [self._wrap(f, 'after_request') for f in funcs]
+        for endpoint, view in list(app.view_functions.items()):
+            app.view_functions[endpoint] = self._wrap(view, 'view', endpoint)
+        app.json.response = self._wrap(app.json.response, 'serialize')
+
+        app.before_request_funcs[None].insert(0, self._start_trace)
+        app.after_request_funcs[None].insert(0, self._finish_trace)
+        with app.app_context():
+            for engine in db.engines.values():
+                self._instrument_engine(engine)
+
+    def _wrap(self, func, kind, label=None):
+        name = f'{kind}:{label or getattr(func, "__name__", "?")}'
+
+        @wraps(func)
+        def traced(*args, **kwargs):
+            if _current_trace() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return traced
+
+    def _instrument_engine(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current_trace() is not None:
+                conn.info.setdefault('_trace_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            trace = _current_trace()
+            starts = conn.info.get('_trace_start')
+            if trace is None or not starts:
+                return
+            start, end = starts.pop(), time.perf_counter()
+            trace.add('sql', start, end, statement=statement[:MAX_STATEMENT_LENGTH])
+            if end - start >= self.slow_query and not executemany:
+                trace.slow_statements.append((len(trace.spans) - 1, conn.engine, statement, parameters))
+
+    # Tracing
+
+    def _start_trace(self):
+        if random.random() < self.sample_rate:
+            g._trace = Trace()
+
+    def _finish_trace(self, response):
+        trace = g.pop('_trace', None)
+        if trace is None:
+            return response
+        elapsed = time.perf_counter() - trace.start
+        if elapsed >= self.slow_request or trace.slow_statements:
+            for index, engine, statement, parameters in trace.slow_statements:
+                trace.spans[index]['plan'] = explain(engine, statement, parameters)
+            self.logger.info(json.dumps({
+                'trace_id': trace.id,
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 3),
+                'spans': trace.spans,
+            }, default=str))
+        response.headers['X-Trace-Id'] = trace.id
+        return response
+
+    # Profiling
+
+    def _start_profile(self):
+        if request.args.get('_profile') == '1' and is_admin_request():
+            g._profiler = cProfile.Profile()
+            g._profiler.enable()
+
+    def _finish_profile(self, response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(current_app.config.get('PROFILE_TOP', 40))
+        summary = current_app.response_class(out.getvalue(), mimetype='text/plain')
+        summary.headers['X-Profiled-Status'] = str(response.status_code)
+        return summary
+
+
+def explain(engine, statement, parameters):
+    """Return the query plan of a SELECT as a list of strings."""
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    if engine.dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif engine.dialect.name == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE off) '
+    else:
+        prefix = 'EXPLAIN '
+    try:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+    return [' | '.join(str(v) for v in row) for row in rows]
+
+
+tracer = Tracer()
@@ -0,0 +1,183 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from app import db
+from app.models.product import Product
+from app.models.upload_job import UploadJob
+from app.utils.cache import bump_catalog_version
+from app.utils.db_routing import replica_router
+from app.utils.images import cloudinary_variants, local_upload_path
+from app.utils.storage import create_remote_uploader
+from app.utils.tracing import span
+from app.utils.workers import BoundedExecutor
+
+
+class UploadQueue:
+    """Copies locally stored product images to the remote backend.
+
+    Jobs are persisted in `upload_jobs` so their status can be read from any
+    worker process, and run in a bounded per-process pool with exponential
+    backoff between attempts. When a job finishes the product is switched
+    from its local image URL to the remote one, unless the image was replaced
+    in the meantime.
+
+    Jobs the pool has no room for simply stay `queued`. resume() picks up
+    queued jobs, and running ones abandoned by a dead worker, at startup and
+    whenever a job finishes; a job is claimed atomically before it runs, so
+    two workers never upload the same one.
+    """
+
+    def __init__(self):
+        self.uploader = None
+        self.executor = BoundedExecutor('upload', 'UPLOAD_WORKERS', 'UPLOAD_QUEUE_SIZE')
+        self._submitted = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.uploader = create_remote_uploader(app)
+        if self.enabled:
+            threading.Thread(target=self._resume_at_start, args=(app,),
+                             name='upload-resume', daemon=True).start()
+
+    @property
+    def enabled(self):
+        return self.uploader is not None
+
+    def enqueue(self, product):
+        """Queue the product's current local image; returns the job or None."""
+        if not self.enabled or local_upload_path(product.image_url) is None:
+            return None
+
+        job = UploadJob(product_id=product.id, source_url=product.image_url, status='queued', attempts=0)
+        db.session.add(job)
+        db.session.commit()
+        self._submit(job.id)
+        return job
+
+    def retry(self, job):
+        job.status = 'queued'
+        job.attempts = 0
+        job.error = None
+        replica_router.mark_write()
+        db.session.commit()
+        self._submit(job.id)
+
+    def is_stale(self, job):
+        """True for a queued or running job nobody has touched for UPLOAD_STALE_AFTER."""
+        stale_after = timedelta(seconds=current_app.config.get('UPLOAD_STALE_AFTER', 600))
+        return (job.status in ('queued', 'running') and job.updated_at is not None
+                and job.updated_at < datetime.utcnow() - stale_after)
+
+    def _submit(self, job_id, app=None):
+        """Hand a job to the pool; returns False if the pool is full."""
+        app = app or current_app._get_current_object()
+        with self._lock:
+            if job_id in self._submitted:
+                return True
+            self._submitted.add(job_id)
+        future = self.executor.submit(app, self._run, app, job_id)
+        if future is not None:
+            if not app.config.get('BACKGROUND_JOBS_SYNC'):
+                # The slot is free again: pick up jobs the pool had no room for.
+                future.add_done_callback(lambda _: self._resume_at_start(app))
+            return True
+        # No room: the job stays queued until resume() finds it.
+        with self._lock:
+            self._submitted.discard(job_id)
+        return False
+
+    def _resume_at_start(self, app):
+        with app.app_context():
+            try:
+                self.resume(app)
+            except Exception as e:
+                app.logger.error(f'Resuming upload jobs failed: {e}')
+            finally:
+                db.session.remove()
+
+    def resume(self, app):
+        """Submit queued jobs, and running jobs left stale by a dead worker."""
+        stale_before = datetime.utcnow() - timedelta(seconds=app.config.get('UPLOAD_STALE_AFTER', 600))
+        db.session.execute(
+            update(UploadJob)
+            .where(UploadJob.status == 'running', UploadJob.updated_at < stale_before)
+            .values(status='queued', updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        job_ids = db.session.execute(
+            select(UploadJob.id).where(UploadJob.status == 'queued').order_by(UploadJob.id)
+        ).scalars().all()
+        for job_id in job_ids:
+            if not self._submit(job_id, app):
+                break
+
+    def _claim(self, job_id):
+        """Atomically move a queued job to running; False if someone else has it."""
+        claimed = db.session.execute(
+            update(UploadJob)
+            .where(UploadJob.id == job_id, UploadJob.status == 'queued')
+            .values(status='running', updated_at=datetime.utcnow())
+        ).rowcount == 1
+        db.session.commit()
+        return claimed
+
+    def _run(self, app, job_id):
+        with app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                job = db.session.get(UploadJob, job_id)
+                remote_url = self._upload_with_retry(app, job)
+                if remote_url is None:
+                    return
+
+                job.remote_url = remote_url
+                job.status = 'done'
+                job.error = None
+                product = db.session.get(Product, job.product_id) if job.product_id else None
+                if product is not None and product.image_url == job.source_url:
+                    product.image_url = remote_url
+                    product.image_variants = cloudinary_variants(remote_url)
+                db.session.commit()
+                bump_catalog_version()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f'Upload job {job_id} failed: {e}')
+            finally:
+                with self._lock:
+                    self._submitted.discard(job_id)
+                db.session.remove()
+
+    def _upload_with_retry(self, app, job):
+        max_attempts = app.config.get('UPLOAD_MAX_ATTEMPTS', 3)
+        backoff = app.config.get('UPLOAD_RETRY_BACKOFF', 2.0)
+
+        path = local_upload_path(job.source_url)
+        if path is None:
+            job.status = 'failed'
+            job.error = 'Local file is missing'
+            db.session.commit()
+            return None
+
+        while True:
+            job.attempts = (job.attempts or 0) + 1
+            db.session.commit()
+            try:
+                with span('remote_upload'):
+                    return self.uploader.upload(path)
+            except Exception as e:
+                job.error = str(e)
+                if job.attempts >= max_attempts:
+                    job.status = 'failed'
+                    db.session.commit()
+                    return None
+                # Stays running (and claimed) while waiting for the next attempt.
+                db.session.commit()
+                time.sleep(backoff * 2 ** (job.attempts - 1))
+
+
+upload_queue = UploadQueue()
@@ -0,0 +1,84 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BoundedExecutor:
+    """Per-process thread pool with a cap on queued work.
+
+    `submit` never queues more than `workers + queue_size` jobs; beyond that
+    the job is refused and the caller decides whether to persist, defer or
+    drop it. Work never runs on the calling (request) thread, except when
+    BACKGROUND_JOBS_SYNC is set, e.g. in tests.
+    """
+
+    def __init__(self, name, workers_key, queue_size_key):
+        self.name = name
+        self.workers_key = workers_key
+        self.queue_size_key = queue_size_key
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self, app):
+        with self._lock:
+            if self._executor is None:
+                workers = max(1, app.config.get(self.workers_key, 2))
+                queue_size = app.config.get(self.queue_size_key, 16)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name)
+                self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, app, fn, *args):
+        """Run `fn(*args)` in the pool and return its Future.
+
+        Returns None, without running it, if the pool is saturated. Done
+        callbacks added to the Future run after the job's slot is released.
+        """
+        if app.config.get('BACKGROUND_JOBS_SYNC'):
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        self._ensure_started(app)
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+class WorkerThread:
+    """A daemon thread running `target`, started on demand once per process.
+
+    Threads don't survive gunicorn's fork, so instead of starting it in
+    init_app each worker starts its own on first use via `ensure_started`.
+    """
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self._thread.start()
+
+
+def pid_alive(pid):
+    """Whether a process with this pid exists on this host."""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # e.g. EPERM: it exists but belongs to another user
+    return True
@@ -0,0 +1,5 @@
+"""Performance benchmarks for the API.
+
+Run a benchmark module from the backend directory, e.g.
+`python -m benchmarks.serializers`.
+"""
@@ -0,0 +1,253 @@
+"""Drive a fixed request mix against the API and report latency per endpoint.
+
+Runs in-process through the Flask test client (`--mode client`, the
+default) or over HTTP against local gunicorn workers (`--mode gunicorn`).
+Both use the app's configured database; fill it first with
+`python -m benchmarks.synthetic`. Results can be saved as JSON and compared
+with an earlier run to spot regressions between commits:
+
+    python -m benchmarks.load --output before.json
+    python -m benchmarks.load --baseline before.json --fail-over 20
+
+Usage: python -m benchmarks.load [--mode client|gunicorn] [--requests 200]
+       [--concurrency 4] [--workers 2] [--no-cache] [--output F] [--baseline F]
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app import create_app, db
+from app.models import ContactMessage, Product
+from app.utils.cache import catalog_cache
+
+SEARCH_TERMS = ['leather', 'vinyl', 'seat', 'dashboard', 'marine', 'premium stitch', 'headliner']
+
+
+def endpoints(categories, max_id):
+    """(name, admin, path generator) for each endpoint in the mix."""
+    return [
+        ('products_page', False, lambda r: f'/api/products?page={r.randint(1, 50)}&per_page=12'),
+        ('products_category', False,
+         lambda r: f'/api/products?category={urllib.request.quote(r.choice(categories))}&per_page=12'),
+        ('products_cursor', False, lambda r: '/api/products?limit=24'),
+        ('products_sorted', False,
+         lambda r: f"/api/products?sort={r.choice(['price', '-price', 'newest'])}"
+                   f"&min_price={r.choice([0, 100, 250])}&max_price=1000&in_stock=1&per_page=12"),
+        ('product_detail', False, lambda r: f'/api/products/{r.randint(1, max_id)}'),
+        ('categories', False, lambda r: '/api/products/categories'),
+        ('search', False, lambda r: f'/api/products/search?q={urllib.request.quote(r.choice(SEARCH_TERMS))}'),
+        ('admin_inbox', True, lambda r: f'/api/admin/contact-messages?page={r.randint(1, 20)}'),
+        ('admin_inbox_new', True, lambda r: '/api/admin/contact-messages?status=new&limit=20'),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class ClientTarget:
+    """In-process requests through one Flask test client per thread."""
+
+    def __init__(self, app, token):
+        self.app = app
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self._local = threading.local()
+
+    def get(self, path, admin):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.get(path, headers=self.headers if admin else None)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class GunicornTarget:
+    """HTTP requests against gunicorn workers started on a free local port."""
+
+    def __init__(self, token, workers, no_cache):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{port}'
+        self.headers = {'Authorization': f'Bearer {token}'}
+        env = dict(os.environ)
+        if no_cache:
+            env['CATALOG_CACHE_ENABLED'] = '0'
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'run:app', '--workers', str(workers),
+             '--threads', '4', '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and self.process.poll() is None:
+            try:
+                urllib.request.urlopen(f'{self.base_url}/health', timeout=1).read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.close()
+        raise RuntimeError('gunicorn did not start')
+
+    def get(self, path, admin):
+        req = urllib.request.Request(self.base_url + path, headers=self.headers if admin else {})
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def run_endpoint(target, admin, make_path, requests, concurrency, warmup, seed):
+    rng = random.Random(seed)
+    paths = [make_path(rng) for _ in range(warmup + requests)]
+    for path in paths[:warmup]:
+        target.get(path, admin)
+
+    def timed(path):
+        start = time.perf_counter()
+        status = target.get(path, admin)
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, paths[warmup:]))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(requests / wall, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, fail_over):
+    """Print p95/throughput deltas against a baseline; return regressed endpoints."""
+    regressed = []
+    print(f"\nvs baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')})")
+    for name, current in results['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            continue
+        p95_change = (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+        rps_change = (current['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] * 100
+        flag = ''
+        if fail_over is not None and p95_change > fail_over:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:20s} p95 {before["p95_ms"]:9.2f} -> {current["p95_ms"]:9.2f} ms ({p95_change:+6.1f}%)  '
+              f'rps {rps_change:+6.1f}%{flag}')
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('client', 'gunicorn'), default='client')
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--only', help='comma-separated endpoint names')
+    parser.add_argument('--no-cache', action='store_true', help='disable the catalog response cache')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='compare with an earlier --output file')
+    parser.add_argument('--fail-over', type=float, help='exit 1 if any p95 regresses by more than this %%')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    catalog_cache.enabled = not args.no_cache
+    with app.app_context():
+        categories = [c for (c,) in db.session.execute(select(Product.category).distinct())]
+        max_id = db.session.execute(select(func.max(Product.id))).scalar()
+        products = db.session.execute(select(func.count(Product.id))).scalar()
+        messages = db.session.execute(select(func.count(ContactMessage.id))).scalar()
+        database = db.engine.url.render_as_string(hide_password=True)
+    if not max_id:
+        parser.error('the database has no products; run python -m benchmarks.synthetic first')
+
+    mix = endpoints(categories, max_id)
+    if args.only:
+        wanted = set(args.only.split(','))
+        mix = [e for e in mix if e[0] in wanted]
+
+    target = (GunicornTarget(app.config['ADMIN_TOKEN'], args.workers, args.no_cache)
+              if args.mode == 'gunicorn' else ClientTarget(app, app.config['ADMIN_TOKEN']))
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'mode': args.mode,
+            'workers': args.workers if args.mode == 'gunicorn' else None,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'cache': not args.no_cache,
+            'database': database,
+            'products': products,
+            'messages': messages,
+        },
+        'endpoints': {},
+    }
+    try:
+        print(f"{args.mode}, {products} products, {messages} messages, concurrency {args.concurrency}")
+        for name, admin, make_path in mix:
+            stats = run_endpoint(target, admin, make_path, args.requests, args.concurrency,
+                                 args.warmup, args.seed)
+            results['endpoints'][name] = stats
+            print(f"{name:20s} p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  "
+                  f"p99 {stats['p99_ms']:8.2f} ms  {stats['throughput_rps']:8.1f} req/s  "
+                  f"{stats['errors']} errors")
+    finally:
+        target.close()
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressed = compare(results, json.load(fh), args.fail_over)
+        if regressed:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
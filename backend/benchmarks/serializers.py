@@ -0,0 +1,86 @@
+"""Compare the original to_dict() + stdlib jsonify path with the compiled
+encoders and FastJSONProvider on a per_page=100 style listing.
+
+Usage: python -m benchmarks.serializers [--rows 100] [--repeat 200]
+"""
+import argparse
+import timeit
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app
+from app.models import Product
+from app.utils.serializers import FastJSONProvider, ORJSON_AVAILABLE, product_encoder
+
+
+def legacy_to_dict(product):
+    """Product.to_dict() as it was written before the encoder layer."""
+    return {
+        'id': product.id,
+        'name': product.name,
+        'description': product.description,
+        'price': product.price,
+        'category': product.category,
+        'image_url': product.image_url,
+        'image_variants': product.image_variants or {},
+        'in_stock': product.in_stock,
+        'featured': product.featured,
+        'created_at': product.created_at.isoformat() if product.created_at else None,
+        'updated_at': product.updated_at.isoformat() if product.updated_at else None
+    }
+
+
+def make_products(count):
+    now = datetime.utcnow()
+    return [
+        Product(
+            id=i,
+            name=f'Product {i}',
+            description='Complete custom seat upholstery using premium grade leather. ' * 4,
+            price=99.99 + i,
+            category=f'Category {i % 8}',
+            image_url=f'/uploads/{i:064x}.jpg',
+            in_stock=True,
+            featured=i % 5 == 0,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    products = make_products(args.rows)
+    legacy_json = DefaultJSONProvider(app)
+    fast_json = FastJSONProvider(app)
+
+    def legacy():
+        return legacy_json.response({'products': [legacy_to_dict(p) for p in products]}).get_data()
+
+    def fast():
+        return fast_json.response({'products': product_encoder.encode_many(products)}).get_data()
+
+    def fast_sparse():
+        fields = ('id', 'name', 'price', 'category', 'image_url', 'image_variants', 'featured')
+        return fast_json.response({'products': product_encoder.encode_many(products, fields)}).get_data()
+
+    with app.app_context():
+        assert legacy() == fast(), 'fast path output differs from the original'
+        print(f'rows={args.rows} repeat={args.repeat} orjson={ORJSON_AVAILABLE}')
+        baseline = None
+        for name, fn in (('to_dict + jsonify', legacy), ('encoder + fast provider', fast),
+                         ('encoder, ?fields= without description', fast_sparse)):
+            best = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+            baseline = baseline or best
+            print(f'{name:42s} {best * 1e6:9.1f} us/response  {baseline / best:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
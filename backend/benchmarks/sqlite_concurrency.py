@@ -0,0 +1,119 @@
+"""Show that readers keep going while a writer holds the SQLite write lock.
+
+A writer thread repeatedly holds an exclusive write transaction for
+`--hold` seconds while reader threads time simple queries. With the
+default rollback journal the readers stall for the whole transaction;
+with the production profile (WAL, see app/utils/sqlite_profile.py) they
+should not. Exits non-zero if readers were blocked under the profile.
+
+Usage: python -m benchmarks.sqlite_concurrency [--readers 4] [--hold 0.2] [--duration 3]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app.utils.sqlite_profile import apply_pragmas, profile_pragmas
+from config import Config
+
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    if profile:
+        apply_pragmas(conn, profile_pragmas(vars(Config)))
+    return conn
+
+
+def setup(path, profile, rows=1000):
+    conn = connect(path, profile)
+    conn.execute('CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, price REAL)')
+    conn.executemany('INSERT INTO products (name, price) VALUES (?, ?)',
+                     [(f'Product {i}', i * 1.5) for i in range(rows)])
+    conn.close()
+
+
+def writer(path, profile, hold, stop, counts):
+    conn = connect(path, profile)
+    while not stop.is_set():
+        # EXCLUSIVE keeps rollback-journal readers out for the whole
+        # transaction; under WAL it only excludes other writers.
+        conn.execute('BEGIN EXCLUSIVE')
+        conn.execute("INSERT INTO products (name, price) VALUES ('new', 1.0)")
+        time.sleep(hold)
+        conn.execute('COMMIT')
+        counts['writes'] += 1
+        time.sleep(hold / 4)
+    conn.close()
+
+
+def reader(path, profile, stop, latencies, errors):
+    conn = connect(path, profile)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.execute('SELECT COUNT(*), MAX(price) FROM products').fetchone()
+        except sqlite3.OperationalError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(profile, readers, hold, duration):
+    directory = tempfile.mkdtemp(prefix='sqlite-concurrency-')
+    path = os.path.join(directory, 'bench.db')
+    setup(path, profile)
+
+    stop = threading.Event()
+    counts = {'writes': 0}
+    latencies, errors = [], []
+    threads = [threading.Thread(target=writer, args=(path, profile, hold, stop, counts))]
+    threads += [threading.Thread(target=reader, args=(path, profile, stop, latencies, errors))
+                for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    latencies.sort()
+    return {
+        'reads': len(latencies),
+        'writes': counts['writes'],
+        'errors': len(errors),
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None,
+        'max_ms': latencies[-1] * 1000 if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--hold', type=float, default=0.2, help='seconds the writer holds its lock')
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    results = {}
+    for label, profile in (('default', False), ('profile', True)):
+        results[label] = r = run(profile, args.readers, args.hold, args.duration)
+        print(f"{label:>8}: {r['reads']:>8} reads  {r['writes']:>4} writes  {r['errors']} errors  "
+              f"p50 {r['p50_ms']:.3f} ms  p99 {r['p99_ms']:.3f} ms  max {r['max_ms']:.1f} ms")
+
+    # A blocked reader waits out (most of) the writer's transaction.
+    blocked = results['profile']['max_ms'] >= args.hold * 1000 / 2
+    print('readers blocked by writer under profile:', 'yes' if blocked else 'no')
+    return 1 if blocked or results['profile']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
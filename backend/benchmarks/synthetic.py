@@ -0,0 +1,131 @@
+"""Bulk-insert a synthetic catalog and contact inbox for benchmarking.
+
+Categories and statuses are skewed the way real data is: a few categories
+hold most products, most inbox messages are still new. Apart from receipt
+ids, output is deterministic for a given --seed. Uses the app's configured database
+(DATABASE_URL), so point it at a scratch database.
+
+Usage: python -m benchmarks.synthetic --products 100000 --messages 50000 [--reset]
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from app import create_app, db
+from app.models import ContactMessage, Product
+from app.utils.cache import bump_catalog_version
+
+# (category, weight): roughly Zipf, like the real catalog.
+CATEGORIES = [
+    ('Seat Upholstery', 30), ('Interior Restoration', 18), ('Dashboard', 12),
+    ('Headliners', 9), ('Door Panels', 7), ('Carpet', 6), ('Convertible Tops', 5),
+    ('Marine', 4), ('Motorcycle Seats', 3), ('Steering Wheels', 2),
+    ('Custom Stitching', 2), ('Accessories', 2),
+]
+MATERIALS = ['Leather', 'Vinyl', 'Alcantara', 'Suede', 'Canvas', 'Tweed', 'Marine Vinyl']
+STYLES = ['Premium', 'Classic', 'Diamond Stitch', 'Tuck and Roll', 'Sport', 'Vintage', 'OEM']
+STATUSES = [('new', 60), ('read', 30), ('replied', 10)]
+SUBJECTS = ['Quote request', 'Seat repair', 'Headliner sagging', 'Booking', 'Pricing question',
+            'Convertible top', 'Boat seats', 'Follow up']
+
+
+def _weighted(rng, pairs, k):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights, k=k)
+
+
+def product_rows(rng, count, start=0):
+    now = datetime.utcnow()
+    categories = _weighted(rng, CATEGORIES, count)
+    for i, category in enumerate(categories, start):
+        created = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 730))
+        material, style = rng.choice(MATERIALS), rng.choice(STYLES)
+        yield {
+            'name': f'{style} {material} {category} #{i}',
+            'description': f'{style} {category.lower()} work in {material.lower()}. ' * rng.randint(1, 6),
+            # Log-normal: most jobs are a few hundred dollars, a long tail is not.
+            'price': round(min(rng.lognormvariate(5.8, 0.7), 25000), 2),
+            'category': category,
+            'image_url': f'/uploads/synthetic/{i % 500}.jpg',
+            'in_stock': rng.random() < 0.9,
+            'featured': rng.random() < 0.05,
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+def message_rows(rng, count):
+    now = datetime.utcnow()
+    statuses = _weighted(rng, STATUSES, count)
+    for i, status in enumerate(statuses):
+        # Recent messages are more common than old ones.
+        age = timedelta(minutes=int(rng.expovariate(1 / (60 * 24 * 30))))
+        yield {
+            'name': f'Customer {i}',
+            'email': f'customer{i}@example.test',
+            'phone': f'555-{rng.randrange(10000):04d}' if rng.random() < 0.6 else None,
+            'subject': rng.choice(SUBJECTS),
+            'message': 'Hi, I would like a quote for my vehicle. ' * rng.randint(1, 8),
+            'status': status,
+            'created_at': now - age,
+            'receipt_id': uuid.uuid4().hex,
+        }
+
+
+def _insert_batches(model, rows, batch_size):
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(model), batch)
+            db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def seed(products=10000, messages=10000, seed=0, batch_size=5000, reset=False):
+    """Insert synthetic rows inside the current app context; returns counts."""
+    rng = random.Random(seed)
+    db.create_all()
+    if reset:
+        db.session.execute(delete(Product))
+        db.session.execute(delete(ContactMessage))
+        db.session.commit()
+    start = db.session.query(db.func.count(Product.id)).scalar()
+    created = {
+        'products': _insert_batches(Product, product_rows(rng, products, start), batch_size),
+        'messages': _insert_batches(ContactMessage, message_rows(rng, messages), batch_size),
+    }
+    bump_catalog_version()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--reset', action='store_true', help='delete existing products and messages first')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        created = seed(args.products, args.messages, args.seed, args.batch_size, args.reset)
+        elapsed = time.perf_counter() - started
+        print(f"inserted {created['products']} products and {created['messages']} messages "
+              f"into {db.engine.url.render_as_string(hide_password=True)} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,31 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def engine_options(url):
+    """SQLAlchemy engine options for `url`, from the DB_* environment.
+
+    Pool settings only apply to server databases; SQLite keeps the driver
+    defaults Flask-SQLAlchemy picks for it.
+    """
+    if not url or url.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),  # seconds to wait for a connection
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # seconds
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+    }
+    if url.startswith('postgres'):
+        statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 10000))
+        options['connect_args'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+            'options': f'-c statement_timeout={statement_timeout}',
+        }
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     # Read DATABASE_URL from env; if it's a placeholder (contains angle brackets)
@@ -12,9 +37,109 @@ class Config:
         _db_url = ''
     SQLALCHEMY_DATABASE_URI = _db_url or 'sqlite:///uptown_stitch.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Optional read replica: catalog reads and admin listings go here unless
+    # the caller recently wrote (see app/utils/db_routing.py).
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '')
+    SQLALCHEMY_BINDS = {
+        'replica': {'url': DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)}
+    } if DATABASE_REPLICA_URL else {}
+    # Reads stay on the primary this long after an admin write, so replica
+    # lag never hides a change from the admin who just made it.
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    DB_WRITE_MARKER_FILE = os.environ.get('DB_WRITE_MARKER_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'last_write')
+    # File-backed SQLite: WAL and friends on every connection (app/utils/sqlite_profile.py)
+    SQLITE_PRODUCTION_PROFILE = os.environ.get('SQLITE_PRODUCTION_PROFILE', '1') == '1'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -65536))  # negative = KiB
+    SQLITE_CHECKPOINT_INTERVAL = int(os.environ.get('SQLITE_CHECKPOINT_INTERVAL', 60))  # seconds
+    SQLITE_OPTIMIZE_INTERVAL = int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600))  # seconds
     ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or 'admin-token-change-in-production'
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+
+    # Background jobs run in bounded per-process pools; set to run them inline.
+    BACKGROUND_JOBS_SYNC = os.environ.get('BACKGROUND_JOBS_SYNC', '0') == '1'
+
+    # Contact form write-behind: journal + queue submissions and store them in
+    # batches from a background thread, answering 202 immediately.
+    CONTACT_WRITE_BEHIND = os.environ.get('CONTACT_WRITE_BEHIND', '0') == '1'
+    CONTACT_JOURNAL_DIR = os.environ.get('CONTACT_JOURNAL_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'contact_journal')
+    CONTACT_JOURNAL_FSYNC = os.environ.get('CONTACT_JOURNAL_FSYNC', '1') == '1'
+    CONTACT_QUEUE_SIZE = int(os.environ.get('CONTACT_QUEUE_SIZE', 1000))
+    CONTACT_FLUSH_SIZE = int(os.environ.get('CONTACT_FLUSH_SIZE', 100))
+    CONTACT_FLUSH_INTERVAL = float(os.environ.get('CONTACT_FLUSH_INTERVAL', 0.5))  # seconds
+    # Messages the database rejects (bad data, constraint violations) end up here
+    CONTACT_DEAD_LETTER_FILE = os.environ.get('CONTACT_DEAD_LETTER_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'contact_dead_letter.jsonl')
+
+    # Bulk catalog import/export
+    CATALOG_IMPORT_BATCH_SIZE = int(os.environ.get('CATALOG_IMPORT_BATCH_SIZE', 500))
+    CATALOG_EXPORT_BATCH_SIZE = int(os.environ.get('CATALOG_EXPORT_BATCH_SIZE', 500))
+
+    # /uploads serving: set UPLOADS_SENDFILE_HEADER to X-Accel-Redirect (nginx)
+    # or X-Sendfile (Apache/lighttpd) to hand file bytes to the front proxy.
+    UPLOADS_SENDFILE_HEADER = os.environ.get('UPLOADS_SENDFILE_HEADER', '')
+    UPLOADS_ACCEL_PREFIX = os.environ.get('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+    UPLOADS_MAX_AGE = int(os.environ.get('UPLOADS_MAX_AGE', 3600))  # non-hashed names
+
+    # Remote image storage: uploads are saved locally first and copied to the
+    # remote backend ('cloudinary', 'fake' or empty for none) by a job queue.
+    CLOUDINARY_URL = os.environ.get('CLOUDINARY_URL')
+    REMOTE_UPLOADER = os.environ.get('REMOTE_UPLOADER', 'cloudinary' if CLOUDINARY_URL else '')
+    UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', 2))
+    UPLOAD_QUEUE_SIZE = int(os.environ.get('UPLOAD_QUEUE_SIZE', 32))
+    UPLOAD_MAX_ATTEMPTS = int(os.environ.get('UPLOAD_MAX_ATTEMPTS', 3))
+    UPLOAD_RETRY_BACKOFF = float(os.environ.get('UPLOAD_RETRY_BACKOFF', 2.0))  # seconds, doubled per retry
+    # A running job untouched for this long belonged to a dead worker and is resumed
+    UPLOAD_STALE_AFTER = int(os.environ.get('UPLOAD_STALE_AFTER', 600))  # seconds
+
+    # Responsive image variants for local uploads
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    IMAGE_QUEUE_SIZE = int(os.environ.get('IMAGE_QUEUE_SIZE', 16))
+    IMAGE_WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY', 80))
+    IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', 82))
+
+    # Catalog response cache (per process, invalidated via a shared version file)
+    CATALOG_CACHE_ENABLED = os.environ.get('CATALOG_CACHE_ENABLED', '1') == '1'
+    CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 256))
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))  # seconds
+    CATALOG_CACHE_STALE_TTL = int(os.environ.get('CATALOG_CACHE_STALE_TTL', 30))  # seconds
+    CATALOG_VERSION_FILE = os.environ.get('CATALOG_VERSION_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'catalog_version')
+    # Largest batch accepted by /api/products/lookup
+    PRODUCT_LOOKUP_MAX_IDS = int(os.environ.get('PRODUCT_LOOKUP_MAX_IDS', 100))
+    # Largest page returned by /api/products/changes
+    PRODUCT_CHANGES_MAX_LIMIT = int(os.environ.get('PRODUCT_CHANGES_MAX_LIMIT', 1000))
+    # Pre-serialized catalog shared by all workers via a memory-mapped file
+    CATALOG_SNAPSHOT_ENABLED = os.environ.get('CATALOG_SNAPSHOT_ENABLED', '1') == '1'
+    CATALOG_SNAPSHOT_FILE = os.environ.get('CATALOG_SNAPSHOT_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'catalog.snapshot')
+    # Response compression (gzip, or Brotli when the brotli package is installed)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    # Prometheus metrics at /metrics; METRICS_DIR aggregates gunicorn workers
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+    METRICS_DIR = os.environ.get('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))  # seconds
+    # Sampled request tracing; slow requests/statements go to a rotating log
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', '0') == '1'
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.1))
+    TRACE_SLOW_REQUEST_MS = int(os.environ.get('TRACE_SLOW_REQUEST_MS', 500))
+    TRACE_SLOW_QUERY_MS = int(os.environ.get('TRACE_SLOW_QUERY_MS', 100))
+    TRACE_LOG_FILE = os.environ.get('TRACE_LOG_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'slow.log')
+    TRACE_LOG_MAX_BYTES = int(os.environ.get('TRACE_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    TRACE_LOG_BACKUPS = int(os.environ.get('TRACE_LOG_BACKUPS', 5))
+    # ?_profile=1 with the admin token returns a cProfile summary
+    PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '1') == '1'
+    # Shared-cache lifetime for catalog responses; browsers always revalidate
+    CATALOG_S_MAXAGE = int(os.environ.get('CATALOG_S_MAXAGE', 300))
     
     # Production settings
     DEBUG = False
@@ -56,6 +181,14 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
+    DB_WRITE_MARKER_FILE = None
+    BACKGROUND_JOBS_SYNC = True
+    REMOTE_UPLOADER = ''
+    UPLOAD_RETRY_BACKOFF = 0
+    CATALOG_VERSION_FILE = None
+    CATALOG_SNAPSHOT_ENABLED = False
     
 config = {
     'development': DevelopmentConfig,
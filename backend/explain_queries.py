@@ -0,0 +1,152 @@
+"""Print the query plan of every listing query the API runs.
+
+Usage: python explain_queries.py [--check]
+
+Uses the database configured for the app (DATABASE_URL), so it works against
+the local SQLite file as well as Postgres. Plans that scan a whole table or
+sort in a temporary structure are flagged with "!!".
+
+--check instead plans every /products sort and filter combination (first
+page and cursor page) and exits 1 if any of them needs a sort step.
+"""
+import itertools
+import sys
+from datetime import datetime
+
+from app import create_app, db
+from app.models import Product, ContactMessage
+from app.routes.products import PRODUCT_SORTS, product_filters
+from app.utils.changes import product_changes
+from app.utils.facets import product_facet_counts
+from app.utils.pagination import apply_keyset, encode_cursor
+from app.utils.search import search_products
+
+SAMPLE_CURSOR_TIME = datetime(2026, 1, 1)
+SAMPLE_CURSOR_VALUES = {'id': 100, 'price': 250.0, 'created_at': SAMPLE_CURSOR_TIME}
+
+
+def endpoint_queries():
+    """Return (label, query) pairs mirroring the shapes issued by the routes."""
+    return [
+        # Unfiltered first page: an ordered primary-key scan that stops at LIMIT.
+        ('GET /products', Product.query.order_by(Product.id).limit(12)),
+        ('GET /products?category=', Product.query.filter(Product.category == 'Carpet')
+            .order_by(Product.id).limit(12)),
+        ('GET /products?featured=1', Product.query.filter(Product.featured == True)
+            .order_by(Product.id).limit(12)),
+        ('GET /products?category=&featured=1', Product.query
+            .filter(Product.category == 'Carpet', Product.featured == True)
+            .order_by(Product.id).limit(12)),
+        ('GET /products?cursor=', Product.query.filter(Product.id > 100)
+            .order_by(Product.id).limit(13)),
+        ('GET /products?category=&cursor=', Product.query
+            .filter(Product.category == 'Carpet', Product.id > 100)
+            .order_by(Product.id).limit(13)),
+        # Sorted listings walk the matching (filter, sort key, id) index,
+        # backwards for descending sorts; see sort_filter_queries().
+        ('GET /products?sort=price', products_query(sort='price')),
+        ('GET /products?category=&sort=-price', products_query(category='Carpet', sort='-price')),
+        ('GET /products?featured=1&sort=newest', products_query(featured=True, sort='newest')),
+        ('GET /products?min_price=&max_price=&sort=newest',
+            products_query(min_price=100, max_price=500, sort='newest')),
+        ('GET /products?category=&min_price=&sort=price&cursor=',
+            products_query(category='Carpet', min_price=100, sort='price', cursor=True)),
+        ('GET /products/<id>', Product.query.filter(Product.id == 1)),
+        ('GET /products/categories', db.session.query(product_facet_counts.c.category).distinct()
+            .order_by(product_facet_counts.c.category)),
+        # Reads the whole facet summary: a few rows per category, never products.
+        ('GET /products/facets', db.session.query(product_facet_counts)),
+        # Seeks the change log by version and joins each change to its product.
+        ('GET /products/changes?since=', db.session.query(product_changes, Product)
+            .outerjoin(Product, Product.id == product_changes.c.product_id)
+            .filter(product_changes.c.version > 100)
+            .order_by(product_changes.c.version).limit(501)),
+        # Ranked results: the sort only covers the rows that matched.
+        ('GET /products/search?q=', search_products(Product.query, 'leather seat',
+                                                    db.engine.dialect.name).limit(20)),
+        ('GET /admin/contact-messages', ContactMessage.query
+            .order_by(ContactMessage.created_at.desc(), ContactMessage.id.desc()).limit(20)),
+        ('GET /admin/contact-messages?status=', ContactMessage.query
+            .filter(ContactMessage.status == 'new')
+            .order_by(ContactMessage.created_at.desc(), ContactMessage.id.desc()).limit(20)),
+        ('GET /admin/contact-messages?status=&cursor=', ContactMessage.query
+            .filter(ContactMessage.status == 'new', ContactMessage.created_at < SAMPLE_CURSOR_TIME)
+            .order_by(ContactMessage.created_at.desc(), ContactMessage.id.desc()).limit(21)),
+    ]
+
+
+def products_query(category=None, featured=None, in_stock=None, min_price=None,
+                   max_price=None, sort='id', cursor=False):
+    """The row query GET /products issues for these parameters."""
+    columns, descending = PRODUCT_SORTS[sort]
+    query = Product.query.filter(*product_filters(category, featured, in_stock,
+                                                  min_price, max_price, sort))
+    if cursor:
+        cursor = encode_cursor([SAMPLE_CURSOR_VALUES[c.key] for c in columns])
+    return apply_keyset(query, columns, cursor or None, limit=12, descending=descending)[0]
+
+
+def sort_filter_queries():
+    """(label, query) for every /products sort and filter combination."""
+    prices = [(None, None), (100, None), (None, 500), (100, 500)]
+    for category, featured, in_stock, (min_price, max_price), sort, cursor in itertools.product(
+            [None, 'Carpet'], [None, True, False], [None, True], prices, PRODUCT_SORTS, [False, True]):
+        params = {'category': category, 'featured': featured, 'in_stock': in_stock,
+                  'min_price': min_price, 'max_price': max_price, 'sort': sort}
+        label = ' '.join(f'{k}={v}' for k, v in params.items() if v is not None)
+        if cursor:
+            label += ' cursor'
+        yield label, products_query(cursor=cursor, **params)
+
+
+def explain(query):
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        return [row[-1] for row in rows]
+    rows = db.session.execute(db.text(f'EXPLAIN {sql}')).all()
+    return [row[0] for row in rows]
+
+
+def is_suspicious(line):
+    if line.startswith('SCAN') and 'INDEX' not in line:
+        return True
+    return 'Seq Scan' in line or is_sort(line)
+
+
+def is_sort(line):
+    return 'TEMP B-TREE' in line or line.strip().startswith(('Sort', 'Incremental Sort'))
+
+
+def check():
+    """Plan every /products combination; return the number that sort."""
+    failures = total = 0
+    for label, query in sort_filter_queries():
+        total += 1
+        plan = explain(query)
+        if any(is_sort(line) for line in plan):
+            failures += 1
+            print(f'\n!! {label}')
+            for line in plan:
+                print(f'     {line}')
+    print(f'\n{total - failures}/{total} sort/filter combinations avoid a sort step')
+    return failures
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        if '--check' in sys.argv[1:]:
+            return 1 if check() else 0
+        print(f'Dialect: {db.engine.dialect.name}')
+        for label, query in endpoint_queries():
+            print(f'\n{label}')
+            for line in explain(query):
+                marker = '!!' if is_suspicious(line) else '  '
+                print(f'  {marker} {line}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
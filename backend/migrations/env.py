@@ -45,6 +45,24 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Objects created with raw DDL in app/utils rather than declared on the
+# models. Autogenerate must not emit drops for them.
+RAW_DDL_TABLE_PREFIXES = ('products_fts',)  # SQLite FTS5 table and shadow tables
+RAW_DDL_TABLES = {'product_facet_counts', 'product_changes'}
+RAW_DDL_COLUMNS = {('products', 'search_vector')}
+RAW_DDL_INDEXES = {'ix_products_search_vector'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table':
+        return not (name in RAW_DDL_TABLES or name.startswith(RAW_DDL_TABLE_PREFIXES))
+    if type_ == 'column':
+        return (object.table.name, name) not in RAW_DDL_COLUMNS
+    if type_ == 'index':
+        return name not in RAW_DDL_INDEXES
+    return True
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +83,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +112,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
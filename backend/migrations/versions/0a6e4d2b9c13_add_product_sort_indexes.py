@@ -0,0 +1,34 @@
+"""Add product sort indexes
+
+Revision ID: 0a6e4d2b9c13
+Revises: f3b8c1d7a926
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6e4d2b9c13'
+down_revision = 'f3b8c1d7a926'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_products_price_id', ['price', 'id']),
+    ('ix_products_category_price_id', ['category', 'price', 'id']),
+    ('ix_products_featured_price_id', ['featured', 'price', 'id']),
+    ('ix_products_created_at_id', ['created_at', 'id']),
+    ('ix_products_category_created_at_id', ['category', 'created_at', 'id']),
+    ('ix_products_featured_created_at_id', ['featured', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, 'products', columns, unique=False)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='products')
@@ -0,0 +1,34 @@
+"""Add listing indexes
+
+Revision ID: 4b1d7c2e9a10
+Revises: 9ef77e2c66c0
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1d7c2e9a10'
+down_revision = '9ef77e2c66c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_products_category_featured_id', 'products', ['category', 'featured', 'id'], unique=False)
+    op.create_index('ix_products_category_id', 'products', ['category', 'id'], unique=False)
+    op.create_index('ix_products_featured_id', 'products', ['featured', 'id'], unique=False)
+    op.create_index('ix_contact_messages_status_created_at', 'contact_messages',
+                    ['status', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_contact_messages_created_at', 'contact_messages',
+                    [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_contact_messages_created_at', table_name='contact_messages')
+    op.drop_index('ix_contact_messages_status_created_at', table_name='contact_messages')
+    op.drop_index('ix_products_featured_id', table_name='products')
+    op.drop_index('ix_products_category_id', table_name='products')
+    op.drop_index('ix_products_category_featured_id', table_name='products')
@@ -0,0 +1,34 @@
+"""Add the product change log
+
+Revision ID: 5d9e2a7c4b18
+Revises: 0a6e4d2b9c13
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+
+from app.utils.ddl import dialect_statements
+from app.utils.changes import (
+    POSTGRES_CHANGES_DDL,
+    POSTGRES_CHANGES_DROP,
+    SQLITE_CHANGES_DDL,
+    SQLITE_CHANGES_DROP,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9e2a7c4b18'
+down_revision = '0a6e4d2b9c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The DDL ends by logging every existing product as created.
+    for statement in dialect_statements(op.get_bind(), SQLITE_CHANGES_DDL, POSTGRES_CHANGES_DDL):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in dialect_statements(op.get_bind(), SQLITE_CHANGES_DROP, POSTGRES_CHANGES_DROP):
+        op.execute(statement)
@@ -0,0 +1,33 @@
+"""Add product full-text search index
+
+Revision ID: 7c3e5a91d2f4
+Revises: 4b1d7c2e9a10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+from app.utils.ddl import dialect_statements
+from app.utils.search import (
+    POSTGRES_SEARCH_DDL,
+    POSTGRES_SEARCH_DROP,
+    SQLITE_SEARCH_DDL,
+    SQLITE_SEARCH_DROP,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5a91d2f4'
+down_revision = '4b1d7c2e9a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for statement in dialect_statements(op.get_bind(), SQLITE_SEARCH_DDL, POSTGRES_SEARCH_DDL):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in dialect_statements(op.get_bind(), SQLITE_SEARCH_DROP, POSTGRES_SEARCH_DROP):
+        op.execute(statement)
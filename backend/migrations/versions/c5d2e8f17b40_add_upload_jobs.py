@@ -0,0 +1,37 @@
+"""Add upload jobs
+
+Revision ID: c5d2e8f17b40
+Revises: a81f4c6b3e27
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d2e8f17b40'
+down_revision = 'a81f4c6b3e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('source_url', sa.String(length=500), nullable=False),
+    sa.Column('remote_url', sa.String(length=500), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_upload_jobs_product_id', 'upload_jobs', ['product_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_upload_jobs_product_id', table_name='upload_jobs')
+    op.drop_table('upload_jobs')
@@ -0,0 +1,23 @@
+"""Add product name index
+
+Revision ID: d9a6b3c48e15
+Revises: c5d2e8f17b40
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a6b3c48e15'
+down_revision = 'c5d2e8f17b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_products_name', 'products', ['name'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_products_name', table_name='products')
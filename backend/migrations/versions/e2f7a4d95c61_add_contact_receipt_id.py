@@ -0,0 +1,28 @@
+"""Add contact message receipt id
+
+Revision ID: e2f7a4d95c61
+Revises: d9a6b3c48e15
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f7a4d95c61'
+down_revision = 'd9a6b3c48e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contact_messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('receipt_id', sa.String(length=32), nullable=True))
+        batch_op.create_unique_constraint('uq_contact_messages_receipt_id', ['receipt_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('contact_messages', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_contact_messages_receipt_id', type_='unique')
+        batch_op.drop_column('receipt_id')
@@ -0,0 +1,34 @@
+"""Add incrementally maintained product facet counts
+
+Revision ID: f3b8c1d7a926
+Revises: e2f7a4d95c61
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+from app.utils.ddl import dialect_statements
+from app.utils.facets import (
+    POSTGRES_FACETS_DDL,
+    POSTGRES_FACETS_DROP,
+    SQLITE_FACETS_DDL,
+    SQLITE_FACETS_DROP,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8c1d7a926'
+down_revision = 'e2f7a4d95c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The DDL ends by backfilling the counts from existing products.
+    for statement in dialect_statements(op.get_bind(), SQLITE_FACETS_DDL, POSTGRES_FACETS_DDL):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in dialect_statements(op.get_bind(), SQLITE_FACETS_DROP, POSTGRES_FACETS_DROP):
+        op.execute(statement)
@@ -1,5 +1,6 @@
 from app import create_app, db
 from app.models import Product
+from app.utils.cache import bump_catalog_version
 
 def seed_data():
     app = create_app()
@@ -70,6 +71,7 @@ def seed_data():
             db.session.add(product)
         
         db.session.commit()
+        bump_catalog_version()
         print("Sample data seeded successfully!")
 
 if __name__ == '__main__':
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, db
+from app.models.product import Product
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def baseline_body(app, obj):
+    return DefaultJSONProvider(app).response(obj).get_data()
+
+
+def test_product_with_accented_name_matches_default_provider(app):
+    product = Product(name='Canapé velours – 😀', description='Tissu\x7f', price=1299.5,
+                      category='Salon', image_url='', image_variants={})
+    db.session.add(product)
+    db.session.commit()
+
+    response = app.test_client().get(f'/api/products/{product.id}')
+    assert response.status_code == 200
+    assert response.get_data() == baseline_body(app, product.to_dict())
+    assert b'Canap\\u00e9' in response.get_data()
+    assert b'\\ud83d\\ude00' in response.get_data()
+
+
+@pytest.mark.parametrize('obj', [
+    {'b': 1, 'a': [1e16, 1e-9, 0.00001, 2e-05, 899.99, -0.0]},
+    {'big': 2 ** 70, 'name': 'naïve line'},
+    {1: 'non-string key'},
+    {'when': datetime(2026, 1, 2, 3, 4, 5)},
+    ['3e5 model in a string', None, True],
+])
+def test_response_matches_default_provider(app, obj):
+    assert app.json.response(obj).get_data() == baseline_body(app, obj)
+
+
+def test_compact_dumps_matches_stdlib(app):
+    obj = {'name': 'Ålesund', 'price': 1e16}
+    assert app.json.dumps(obj) == DefaultJSONProvider(app).dumps(obj)
+    assert (app.json.dumps(obj, separators=(',', ':'))
+            == DefaultJSONProvider(app).dumps(obj, separators=(',', ':')))
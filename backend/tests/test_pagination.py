@@ -0,0 +1,47 @@
+import base64
+import json
+
+import pytest
+
+from app.models.contact import ContactMessage
+from app.models.product import Product
+from app.utils.pagination import decode_cursor, encode_cursor
+
+COLUMNS = [ContactMessage.created_at, ContactMessage.id]
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def test_round_trip():
+    values = decode_cursor(encode_cursor(['2026-01-02T03:04:05', 7]), COLUMNS)
+    assert values[0].isoformat() == '2026-01-02T03:04:05'
+    assert values[1] == 7
+
+
+@pytest.mark.parametrize('payload', [
+    {'v': [1, 2]},
+    [1, 2],
+    [None, 2],
+    ['not a date', 2],
+    ['2026-01-02T03:04:05', [2]],
+    ['2026-01-02T03:04:05', True],
+    ['2026-01-02T03:04:05', '2'],
+    ['2026-01-02T03:04:05', 2.5],
+    ['2026-01-02T03:04:05'],
+    ['2026-01-02T03:04:05', 2, 3],
+])
+def test_wrong_shape_or_types_are_invalid(payload):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(raw_cursor(payload), COLUMNS)
+
+
+def test_garbage_is_invalid():
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor('%%%', COLUMNS)
+
+
+def test_price_cursor_accepts_int_and_float():
+    assert decode_cursor(encode_cursor([10, 3]), [Product.price, Product.id]) == [10, 3]
+    assert decode_cursor(encode_cursor([9.5, 3]), [Product.price, Product.id]) == [9.5, 3]
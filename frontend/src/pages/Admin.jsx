@@ -1,6 +1,16 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { productsAPI } from '../services/api'
 
+const PRODUCT_LIST_SIZE = 100
+
+// Merge a change feed page into the id-ordered product list.
+function applyChanges(products, changed, deleted) {
+  const byId = new Map(products.map((p) => [p.id, p]))
+  changed.forEach((p) => byId.set(p.id, p))
+  deleted.forEach((id) => byId.delete(id))
+  return [...byId.values()].sort((a, b) => a.id - b.id).slice(0, PRODUCT_LIST_SIZE)
+}
+
 function Admin() {
   const [token, setToken] = useState('')
   const [name, setName] = useState('')
@@ -14,11 +24,16 @@ function Admin() {
   const [loading, setLoading] = useState(false)
   const [products, setProducts] = useState([])
   const [loadingProducts, setLoadingProducts] = useState(false)
+  const changesVersion = useRef(null)
 
   const fetchProducts = async () => {
     try {
       setLoadingProducts(true)
-      const res = await productsAPI.getAll({ per_page: 100 })
+      // Read the change version first; anything changed while the list
+      // loads is just applied again by the next sync.
+      const head = await productsAPI.getChanges()
+      const res = await productsAPI.getAll({ per_page: PRODUCT_LIST_SIZE })
+      changesVersion.current = head.data.version
       setProducts(res.data.products || [])
     } catch (error) {
       console.error('Failed to fetch products', error)
@@ -27,6 +42,27 @@ function Admin() {
     }
   }
 
+  // Apply only what changed since the last fetch or sync.
+  const syncProducts = async () => {
+    let since = changesVersion.current
+    if (since === null) return fetchProducts()
+    try {
+      let hasMore = true
+      while (hasMore) {
+        const res = await productsAPI.getChanges(since)
+        const { products: changed, deleted, version, has_more } = res.data
+        // A lower version means the change log was reset.
+        if (version < since) return fetchProducts()
+        setProducts((prev) => applyChanges(prev, changed, deleted))
+        since = version
+        hasMore = has_more
+      }
+      changesVersion.current = since
+    } catch (error) {
+      console.error('Failed to sync products', error)
+    }
+  }
+
   useEffect(() => {
     fetchProducts()
   }, [])
@@ -70,7 +106,7 @@ function Admin() {
       setInStock(true)
       setImageFile(null)
       e.target.reset()
-      fetchProducts()
+      syncProducts()
     } catch (error) {
       const message = error.response?.data?.error || error.message || 'Failed to create product.'
       setStatus({ type: 'error', message })
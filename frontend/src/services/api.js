@@ -30,6 +30,11 @@ export const productsAPI = {
   getAll: (params = {}) => api.get('/products', { params }),
   getById: (id) => api.get(`/products/${id}`),
   getCategories: () => api.get('/products/categories'),
+  getFacets: (params = {}) => api.get('/products/facets', { params }),
+  // Batch lookup, e.g. to refresh cart prices: { products, missing }
+  lookup: (ids) => api.post('/products/lookup', { ids }),
+  // Catalog changes after `since`: { products, deleted, version, has_more }
+  getChanges: (since) => api.get('/products/changes', { params: { since } }),
   
   // Admin endpoints
   create: (data, token) => api.post('/admin/products', data, {